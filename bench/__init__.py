@@ -0,0 +1,5 @@
+"""
+Repository-wide benchmark suite: every day's solver timed on its bundled
+input and on scaled-up synthetic inputs, checked against a baseline.
+See bench.runner, and bench.days for the registry of solvers.
+"""
@@ -0,0 +1,47 @@
+"""
+Run the benchmark suite from the repository root:
+    python -m bench                       every day, bundled inputs
+    python -m bench p1 p13 --scale 10 100 selected days, plus synthetic inputs
+    python -m bench --save                record the results as the baseline
+Exits with status 1 if any result regressed against the baseline.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench import runner
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    parser.add_argument("days",nargs="*",help="days to run, e.g. p1 p13 (default: all)")
+    parser.add_argument("--scale",nargs="*",type=int,default=[],help="synthetic input scales")
+    parser.add_argument("--repeat",type=int,default=5,help="fewest runs per timing")
+    parser.add_argument("--tolerance",type=float,default=0.25,help="allowed slowdown before flagging")
+    parser.add_argument("--no-memory",action="store_true",help="skip the tracemalloc run")
+    parser.add_argument("--save",action="store_true",help="store the results as the new baseline")
+    parser.add_argument("--baseline",default=runner.BASELINE,help="baseline file")
+    args = parser.parse_args(argv)
+
+    results = runner.run(args.days,args.scale,args.repeat,not args.no_memory,log=lambda s:None)
+    baseline = runner.load_baseline(args.baseline)
+    if not args.save:
+        results = runner.confirm_slower(results,baseline,args.tolerance,args.repeat,scales=args.scale)
+    regressed = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        flags = runner.compare(result,base,args.tolerance)
+        print(runner.format_row(key,result,base,flags))
+        if runner.is_regression(flags):
+            regressed.append(key)
+    if args.save:
+        runner.save_baseline(results,args.baseline)
+        print("baseline saved to {}".format(args.baseline))
+    elif regressed:
+        print("regressions: {}".format(", ".join(regressed)))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Registry of every day's solver for the benchmark runner.
+
+Each entry is (name, solver, input file, synthetic input generator):
+  solver(text) takes the puzzle input as a string and returns
+      (answers, n_instructions), where n_instructions is the number of
+      Intcode instructions executed, or None if the day does not run Intcode
+      or cannot count them
+  the input file is relative to the repository root (None for days whose
+      input is built into the solver)
+  synthetic(scale, rng) returns an input about scale times larger than the
+      bundled one, or None if the day has no meaningful scaled-up input
+"""
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def day_module(day, name):
+    """
+    Import module name from the folder of the given day (e.g. "p13").
+    """
+    path = os.path.join(ROOT,day)
+    if path not in sys.path:
+        sys.path.insert(0,path)
+    return __import__(name)
+
+def parse_intcode(text):
+    return [int(c) for c in text.strip().split(",")]
+
+def run_intcode(code, inputs):
+    """
+    Run code with inputs until it halts; return (outputs, instructions).
+    """
+    from intcode import Program
+    vm = Program(code)
+    vm.add_inputs(inputs)
+    _, outputs = vm.run()
+    return outputs, vm.n_steps
+
+# p1: fuel for module masses
+
+def p1(text):
+    mod = day_module("p1","p1")
+    masses = np.array(text.split(),dtype=float)
+    return (mod.total_fuel(masses), mod.total_fuel_with_fuel(masses)), None
+
+def p1_synthetic(scale, rng):
+    return "\n".join(str(rng.randint(50000,150000)) for _ in range(100*scale))
+
+# p2: noun/verb search
+
+def p2_solver(method):
+    def solve(text):
+        noun_verb = day_module("p2","noun_verb")
+        code = parse_intcode(text)
+        part1 = noun_verb.run_pair(code,12,2)
+        noun, verb = noun_verb.find_noun_verb(code,19690720,method=method)
+        return (part1, 100*noun+verb), None
+    return solve
+
+# p3: wire crossings
+
+def p3(text):
+    wires = day_module("p3","wires")
+    return wires.closest([wires.process_wire(line) for line in text.split()]), None
+
+def p3_synthetic(scale, rng):
+    moves = [rng.choice("RLUD")+str(rng.randint(1,1000)) for _ in range(2*301*scale)]
+    return ",".join(moves[:301*scale])+"\n"+",".join(moves[301*scale:])
+
+# p4: password counting
+
+def p4(text):
+    mod = day_module("p4","passwords")
+    lo, hi = map(int,text.strip().split("-"))
+    return (mod.count(lo,hi), mod.count(lo,hi,exact_pair=True)), None
+
+def p4_synthetic(scale, rng):
+    # the puzzle range, or bounds with scale times as many digits
+    if scale == 1:
+        return "357253-892942"
+    lo = rng.randint(10**(6*scale-1),10**(6*scale)//2)
+    return "{}-{}".format(lo,rng.randint(lo,10**(6*scale)-1))
+
+# p6: orbit map
+
+def p6(text):
+    orbits = day_module("p6","orbits")
+    index = orbits.orbit_index(orbits.parse_orbits(text))
+    return (index.total_orbits(), index.transfers("YOU","SAN")), None
+
+def p6_synthetic(scale, rng):
+    """
+    A deep random tree of about 1600*scale objects: each orbits one of the
+    few objects added just before it.
+    """
+    lines = []
+    n = 1600*scale
+    for i in range(1,n):
+        parent = "COM" if i == 1 else "O{}".format(rng.randint(max(1,i-5),i-1))
+        lines.append("{}){}".format(parent,"O{}".format(i)))
+    lines.append("O{})YOU".format(rng.randint(1,n-1)))
+    lines.append("O{})SAN".format(rng.randint(1,n-1)))
+    return "\n".join(lines)
+
+# p8: Space Image Format
+
+def p8(text):
+    mod = day_module("p8","sif")
+    composite, _, counts = mod.decode(mod.digits_from_text(text),6,25)
+    return (mod.checksum(counts), mod.render(composite)), None
+
+def p8_synthetic(scale, rng):
+    # scale times as many 25x6 layers, mostly transparent
+    return "".join(rng.choices("0122222222",k=15000*scale))
+
+# p10: asteroid visibility and laser
+
+def p10(text):
+    asteroids = day_module("p10","asteroids")
+    coords = asteroids.parse_field(text)
+    station, n_visible = asteroids.best_station(coords)
+    row, col = coords[asteroids.vaporisation_order(coords,station)[199]]
+    return (n_visible, int(100*col+row)), None
+
+def p10_synthetic(scale, rng):
+    # the bundled field is 34x33 with about 30% asteroids
+    size = int(34*scale**0.5)
+    return "\n".join("".join("#" if rng.random() < 0.3 else "." for _ in range(size)) for _ in range(size))
+
+# p11: hull painting robot
+
+def p11(text):
+    mod = day_module("p11","robot")
+    code = parse_intcode(text)
+    first = mod.paint_hull(code)
+    second = mod.paint_hull(code,start=mod.WHITE)
+    n_steps = first.prog.n_steps + second.prog.n_steps
+    return (first.canvas.count(1), mod.render(mod.registration(second))), n_steps
+
+# p12: moon simulator
+
+def p12(text):
+    moons = day_module("p12","moons")
+    systems = [moons.parse_positions(block) for block in text.strip().split("\n\n")]
+    positions = systems[0] if len(systems) == 1 else systems
+    sim = moons.moon_simulator(positions)
+    sim.step(1000)
+    energy = int(np.sum(sim.get_total_energy()))
+    periods = moons.moon_simulator(positions).periods()
+    if len(systems) > 1:
+        periods = sorted(set(periods))
+    return (energy, periods), None
+
+def p12_synthetic(scale, rng):
+    """
+    A batch of scale copies of the bundled system, each with its moons and
+    axes shuffled; every copy has the same period.
+    """
+    with open(os.path.join(ROOT,"p12","p12_input.txt"),"r") as f:
+        moons = day_module("p12","moons").parse_positions(f.read())
+    blocks = []
+    for _ in range(scale):
+        axes = rng.sample(range(3),3)
+        shuffled = rng.sample(moons,len(moons))
+        blocks.append("\n".join("<x={}, y={}, z={}>".format(*(m[a] for a in axes)) for m in shuffled))
+    return "\n\n".join(blocks)
+
+# p14: nanofactory
+
+def p14(text):
+    nanofactory = day_module("p14","nanofactory")
+    factory = nanofactory.nanofactory(nanofactory.parse_reactions(text))
+    return (factory.ore_for(1), factory.max_fuel(10**12)), None
+
+def p14_synthetic(scale, rng):
+    """
+    A random layered recipe book with about 60*scale chemicals.
+    """
+    layers = [["ORE"]]
+    n = 0
+    while n < 60*scale:
+        layer = []
+        for _ in range(rng.randint(1,20)):
+            layer.append("C{}".format(n))
+            n += 1
+        layers.append(layer)
+    layers.append(["FUEL"])
+    lines = []
+    for depth, layer in enumerate(layers[1:],1):
+        for chem in layer:
+            below = [c for l in layers[max(0,depth-3):depth] for c in l]
+            deps = rng.sample(below,min(len(below),rng.randint(1,6)))
+            lines.append("{} => {} {}".format(", ".join("{} {}".format(rng.randint(1,20),d) for d in deps),
+                                              rng.randint(1,10),chem))
+    return "\n".join(lines)
+
+# p5, p9: diagnostic and BOOST programs
+
+def intcode_solver(*inputs):
+    def solve(text):
+        code = parse_intcode(text)
+        answers = []
+        n_steps = 0
+        for value in inputs:
+            outputs, n = run_intcode(code,[value])
+            answers.append(outputs[-1])
+            n_steps += n
+        return tuple(answers), n_steps
+    return solve
+
+# p7: amplifier phase search
+
+def p7(text):
+    amplifiers = day_module("p7","amplifiers")
+    code = parse_intcode(text)
+    stats = {}
+    part1, _ = amplifiers.phase_search(code,range(5),stats=stats)
+    part2, _ = amplifiers.phase_search(code,range(5,10),feedback=True,stats=stats)
+    return (part1, part2), stats["instructions"]
+
+# p13: arcade played by the autopilot
+
+def p13(text):
+    mod = day_module("p13","p13")
+    code = parse_intcode(text)
+    blocks = sum(1 for t in run_intcode(code,[])[0][2::3] if t == mod.BLOCK)
+    code[0] = 2
+    arcade = mod.arcade_cabinet(code)
+    stats = arcade.run_program(mod.autopilot)
+    return (blocks, arcade.score), stats["instructions"]
+
+# p15: maze exploration and oxygen fill
+
+def p15(text):
+    mod = day_module("p15","p15")
+    droid = mod.RepairDroid(parse_intcode(text))
+    return (droid.explore(), droid.oxygen_fill_time()), droid.n_steps
+
+# p17: scaffold alignment and movement routines
+
+def p17(text):
+    mod = day_module("p17","scaffold")
+    code = parse_intcode(text)
+    outputs, n_camera = run_intcode(code,[])
+    rows = mod.parse_view("".join(map(chr,outputs)))
+    main, functions = mod.compress(mod.scaffold_path(rows))
+    code[0] = 2
+    outputs, n_robot = run_intcode(code,mod.movement_inputs(main,functions))
+    return (mod.alignment_sum(rows), outputs[-1]), n_camera+n_robot
+
+# synthetic Intcode workload: a counting loop using every addressing mode
+
+def intcode_loop(text):
+    n = int(text)
+    # rel base at 100; [rel+0] counts down from n, [101] counts up, output [101]
+    code = [109,100, 21101,0,n,0, 1001,101,1,101, 21201,0,-1,0, 1205,0,6, 4,101, 99]
+    outputs, n_steps = run_intcode(code,[])
+    return outputs[-1], n_steps
+
+def intcode_loop_synthetic(scale, rng):
+    return str(100000*scale)
+
+DAYS = [
+    ("p1", p1, "p1/p1_input.txt", p1_synthetic),
+    ("p2", p2_solver("symbolic"), "p2/p2_input.txt", None),
+    ("p2 batch", p2_solver("batch"), "p2/p2_input.txt", None),
+    ("p3", p3, "p3/p3_input.txt", p3_synthetic),
+    ("p4", p4, None, p4_synthetic),
+    ("p5", intcode_solver(1,5), "p5/p5_input.txt", None),
+    ("p6", p6, "p6/p6_input.txt", p6_synthetic),
+    ("p7", p7, "p7/p7_input.txt", None),
+    ("p8", p8, "p8/p8_input.txt", p8_synthetic),
+    ("p9", intcode_solver(1,2), "p9/p9_input.txt", None),
+    ("p10", p10, "p10/p10_input.txt", p10_synthetic),
+    ("p11", p11, "p11/p11_input.txt", None),
+    ("p12", p12, "p12/p12_input.txt", p12_synthetic),
+    ("p13", p13, "p13/p13_input.txt", None),
+    ("p14", p14, "p14/p14_input.txt", p14_synthetic),
+    ("p15", p15, "p15/p15_input.txt", None),
+    ("p17", p17, "p17/p17_input.txt", None),
+    ("intcode loop", intcode_loop, None, intcode_loop_synthetic),
+]
@@ -0,0 +1,198 @@
+"""
+Time every day's solver and compare against a stored baseline.
+
+For each entry in bench.days.DAYS, and for each requested scale of its
+synthetic input, the runner records:
+  seconds      : best wall time over the repeats
+  peak_kb      : peak memory allocated by Python during one run (tracemalloc)
+  inst_per_sec : Intcode instructions per second, for solvers that count them
+  answer       : the answers, so a "faster" change that breaks a day is caught
+Results are keyed "p13" for the bundled input and "p1 x10" for a synthetic
+input ten times larger.
+
+A result is flagged when it is slower or uses more memory than the baseline
+by more than the tolerance (and by more than a few milliseconds or
+kilobytes, so tiny runs do not flap), or when its answer changed. Timings
+are the best of as many runs as fit in about a second, and an entry that
+comes out slower is timed again before it is flagged, so a burst of load
+on the machine does not show up as a regression.
+"""
+import json
+import os
+import random
+import time
+import traceback
+import tracemalloc
+
+from .days import DAYS, ROOT
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),"baseline.json")
+MIN_REPEAT_TIME = 1.0 # keep repeating runs until they take this long in total
+MAX_REPEAT_TIME = 3.0 # ...but stop at this total even before repeat runs
+MIN_RUNS = 3 # a best-of-one timing is too noisy to compare, however long
+MIN_SECONDS_DIFF = 0.005
+MIN_KB_DIFF = 64
+REGRESSIONS = {"ERROR", "WRONG ANSWER", "SLOWER", "MORE MEMORY"}
+
+def _jsonable(answer):
+    return json.loads(json.dumps(answer,default=str))
+
+def _read(fname):
+    with open(os.path.join(ROOT,fname),"r") as f:
+        return f.read()
+
+def measure(solver, text, repeat=5, memory=True):
+    """
+    Run solver(text) at least repeat times and for at least MIN_REPEAT_TIME
+    seconds in total, unless the runs pass MAX_REPEAT_TIME first, but never
+    fewer than MIN_RUNS times (then once more under tracemalloc if memory
+    is set). Return a result dict.
+    """
+    best = None
+    total = 0.
+    n_runs = 0
+    while True:
+        start = time.perf_counter()
+        answer, n_steps = solver(text)
+        elapsed = time.perf_counter()-start
+        best = elapsed if best is None else min(best,elapsed)
+        total += elapsed
+        n_runs += 1
+        if n_runs < MIN_RUNS:
+            continue
+        if total >= MAX_REPEAT_TIME or (n_runs >= repeat and total >= MIN_REPEAT_TIME):
+            break
+    result = {"seconds":best, "answer":_jsonable(answer)}
+    if n_steps is not None:
+        result["inst_per_sec"] = n_steps/best
+    if memory:
+        tracemalloc.start()
+        try:
+            solver(text)
+            result["peak_kb"] = tracemalloc.get_traced_memory()[1]/1024
+        finally:
+            tracemalloc.stop()
+    return result
+
+def _jobs(names, scales, seed):
+    """
+    (key, solver, input maker) for each entry run() would benchmark.
+    """
+    for name, solver, fname, synthetic in DAYS:
+        if names and name not in names and name.split()[0] not in names:
+            continue
+        jobs = []
+        if fname is not None:
+            jobs.append((name, lambda fname=fname: _read(fname)))
+        elif synthetic is not None:
+            jobs.append((name, lambda: synthetic(1,random.Random(seed))))
+        else:
+            jobs.append((name, lambda: None))
+        if synthetic is not None:
+            for scale in scales:
+                jobs.append(("{} x{}".format(name,scale), lambda scale=scale: synthetic(scale,random.Random(seed))))
+        for key, make_input in jobs:
+            yield key, solver, make_input
+
+def run(names=None, scales=(), repeat=5, memory=True, seed=0, log=print, keys=None):
+    """
+    Benchmark the days named (all of them by default) on their bundled
+    inputs and on synthetic inputs at each scale, or only the result keys
+    given. Return {key: result}; a solver that raises gets
+    {"error": message}.
+    """
+    results = {}
+    for key, solver, make_input in _jobs(names,scales,seed):
+        if keys is not None and key not in keys:
+            continue
+        try:
+            results[key] = measure(solver,make_input(),repeat,memory)
+        except Exception as e:
+            message = str(e).split("\n")[0]
+            results[key] = {"error":"{}: {}".format(type(e).__name__,message)}
+            log(traceback.format_exc(limit=-1).strip())
+        log(format_row(key,results[key]))
+    return results
+
+def confirm_slower(results, baseline, tolerance=0.25, repeat=5, seed=0, scales=()):
+    """
+    Time the results flagged SLOWER once more and keep the faster of the
+    two timings, so only slowdowns that reproduce are reported.
+    """
+    slow = {key for key, result in results.items()
+            if "SLOWER" in compare(result,baseline.get(key),tolerance)}
+    if not slow:
+        return results
+    again = run(None,scales,repeat,memory=False,seed=seed,log=lambda s:None,keys=slow)
+    for key, result in again.items():
+        old = results[key]
+        if "error" in result or result["seconds"] >= old["seconds"]:
+            continue
+        faster = dict(old,seconds=result["seconds"])
+        if "inst_per_sec" in old:
+            faster["inst_per_sec"] = old["inst_per_sec"]*old["seconds"]/result["seconds"]
+        results[key] = faster
+    return results
+
+def load_baseline(fname=BASELINE):
+    if not os.path.exists(fname):
+        return {}
+    with open(fname,"r") as f:
+        return json.load(f)
+
+def save_baseline(results, fname=BASELINE):
+    """
+    Merge results into the baseline file, skipping errors. A result timed
+    without memory (--no-memory) keeps the peak_kb already stored for its
+    entry, so the memory check stays on for it.
+    """
+    baseline = load_baseline(fname)
+    for key, result in results.items():
+        if "error" in result:
+            continue
+        old = baseline.get(key,{})
+        if "peak_kb" not in result and "peak_kb" in old:
+            result = dict(result,peak_kb=old["peak_kb"])
+        baseline[key] = result
+    with open(fname,"w") as f:
+        json.dump(baseline,f,indent=1,sort_keys=True)
+        f.write("\n")
+
+def compare(result, base, tolerance=0.25):
+    """
+    Flags describing how a result regressed relative to its baseline.
+    """
+    if "error" in result:
+        return ["ERROR"]
+    if base is None:
+        return ["new"]
+    flags = []
+    if result["answer"] != base["answer"]:
+        flags.append("WRONG ANSWER")
+    if (result["seconds"] > base["seconds"]*(1+tolerance)
+            and result["seconds"]-base["seconds"] > MIN_SECONDS_DIFF):
+        flags.append("SLOWER")
+    elif result["seconds"]*(1+tolerance) < base["seconds"]:
+        flags.append("faster")
+    if ("peak_kb" in result and "peak_kb" in base
+            and result["peak_kb"] > base["peak_kb"]*(1+tolerance)
+            and result["peak_kb"]-base["peak_kb"] > MIN_KB_DIFF):
+        flags.append("MORE MEMORY")
+    return flags
+
+def is_regression(flags):
+    return any(flag in REGRESSIONS for flag in flags)
+
+def format_row(key, result, base=None, flags=()):
+    if "error" in result:
+        return "{:<16} {}  ERROR".format(key,result["error"])
+    row = "{:<16} {:>9.4f}s".format(key,result["seconds"])
+    if base is not None and "seconds" in base:
+        row += " ({:+.0%})".format(result["seconds"]/base["seconds"]-1)
+    else:
+        row += " " * 7
+    row += " {:>10,.0f} kB".format(result["peak_kb"]) if "peak_kb" in result else " "*14
+    row += " {:>12,.0f} inst/s".format(result["inst_per_sec"]) if "inst_per_sec" in result else " "*19
+    if flags:
+        row += "  "+", ".join(flags)
+    return row
@@ -0,0 +1,15 @@
+from .memory import Memory
+from .program import Program, decode
+from .loader import load_program, parse_program
+
+# Network pulls in asyncio and SparseGrid numpy; import them on first use so
+# that starting a plain Program stays cheap
+_LAZY = {"Network":".network", "SparseGrid":".grid"}
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY[name],__name__),name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__,name))
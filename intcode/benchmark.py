@@ -0,0 +1,204 @@
+"""
+Measure interpreter throughput (instructions per second) on the day 9
+BOOST program in sensor boost mode (input 2), comparing the table-driven
+Program._step and the compiled-block tier against the original
+string-parsing implementation, and the cold start: how long a fresh
+Python process takes to import the package, load the program and execute
+its first instruction, with the program parsed or read from the loader's
+binary cache.
+
+Run from the repository root:
+    python -m intcode.benchmark
+"""
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from .loader import load_program
+from .program import Program
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOOST_INPUT = os.path.join(ROOT,"p9","p9_input.txt")
+
+class LegacyProgram(Program):
+    """
+    The original interpreter: defaultdict memory, parses the opcode as a
+    string and runs through every instruction check on each step. Kept only
+    as a baseline.
+    """
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = defaultdict(lambda:0)
+        for i,v in enumerate(code):
+            self.code[i] = v
+        self.inputs = []
+
+    def add_inputs(self,inputs):
+        for i in inputs:
+            self.inputs.insert(0,i)
+
+    def _parse_opcode(self, opcode):
+        code = str(opcode)
+        l = len(code)
+        inst = int(code[-2:])
+        modes = []
+        for i in range(l-2):
+            modes.append(int(code[l-3-i]))
+        return inst, modes
+
+    def _step(self):
+        output = None
+        exit_code = 0
+        pos = self.pos
+
+        inst, modes = self._parse_opcode(self.code[pos])
+        if inst == 99:
+            exit_code = 1
+        if inst == 1:
+            modes = modes+(3-len(modes))*[0]
+            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
+            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
+            self.code[self._get_val_idx(pos+3,modes[2])] = v1+v2
+            pos += 4
+        if inst == 2:
+            modes = modes+(3-len(modes))*[0]
+            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
+            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
+            self.code[self._get_val_idx(pos+3,modes[2])] = v1*v2
+            pos += 4
+        if inst == 3:
+            try:
+                modes = modes + (1-len(modes))*[0]
+                self.code[self._get_val_idx(pos+1,modes[0])] = self.inputs.pop()
+                pos += 2
+            except IndexError:
+                exit_code = 2
+        if inst == 4:
+            modes = modes+(1-len(modes))*[0]
+            output = self.code[self._get_val_idx(pos+1,modes[0])]
+            pos += 2
+        if inst == 5:
+            modes = modes+(2-len(modes))*[0]
+            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
+            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
+            if v1 > 0:
+                pos = v2
+            else:
+                pos += 3
+        if inst == 6:
+            modes = modes+(2-len(modes))*[0]
+            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
+            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
+            if v1 == 0:
+                pos = v2
+            else:
+                pos += 3
+        if inst == 7:
+            modes = modes+(3-len(modes))*[0]
+            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
+            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
+            self.code[self._get_val_idx(pos+3,modes[2])] = 1 if v1 < v2 else 0
+            pos += 4
+        if inst == 8:
+            modes = modes+(3-len(modes))*[0]
+            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
+            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
+            self.code[self._get_val_idx(pos+3,modes[2])] = 1 if v1 == v2 else 0
+            pos += 4
+        if inst == 9:
+            modes = modes+(1-len(modes))*[0]
+            self.rel += self.code[self._get_val_idx(pos+1,modes[0])]
+            pos += 2
+        self.pos = pos
+        return exit_code, output
+
+def load_code(fname):
+    return load_program(fname)
+
+def time_program(cls, code, inputs):
+    """
+    Run a fresh instance of cls on code until it halts, stepping by hand so
+    every executed instruction is counted.
+    Return (outputs, n_instructions, seconds).
+    """
+    prog = cls(code)
+    prog.add_inputs(inputs)
+    outputs = []
+    n_inst = 0
+    exit_code = 0
+    start = time.perf_counter()
+    while exit_code == 0:
+        exit_code, output = prog._step()
+        n_inst += 1
+        if output is not None:
+            outputs.append(output)
+    return outputs, n_inst, time.perf_counter()-start
+
+def time_jit(code, inputs):
+    """
+    Run code with compiled blocks enabled until it halts.
+    Return (outputs, seconds).
+    """
+    prog = Program(code)
+    prog.add_inputs(inputs)
+    prog.enable_jit()
+    start = time.perf_counter()
+    _, outputs = prog.run()
+    return outputs, time.perf_counter()-start
+
+COLD_START = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0,{root!r})
+from intcode import Program, load_program
+imported = time.perf_counter()
+vm = Program(load_program({fname!r},{cache}))
+loaded = time.perf_counter()
+vm._step()
+print(time.time(), imported-start, loaded-imported, time.perf_counter()-loaded)
+"""
+
+def cold_start(fname, cached=True, repeat=7):
+    """
+    Launch fresh interpreters that load fname and run its first
+    instruction. Return the median run's seconds as (launch to first
+    instruction, import, load, first step).
+    """
+    script = COLD_START.format(root=ROOT,fname=fname,cache="" if cached else "None")
+    if cached: # make sure the cache exists
+        subprocess.run([sys.executable,"-c",script],check=True,capture_output=True)
+    runs = []
+    for _ in range(repeat):
+        launched = time.time()
+        out = subprocess.run([sys.executable,"-c",script],check=True,capture_output=True,text=True).stdout
+        first, *parts = map(float,out.split())
+        runs.append((first-launched, *parts))
+    runs.sort()
+    return runs[len(runs)//2]
+
+def main():
+    code = load_code(BOOST_INPUT)
+    results = {}
+    for name, cls in [("legacy _step",LegacyProgram),("decoded _step",Program)]:
+        outputs, n_inst, secs = time_program(cls,code,[2])
+        results[name] = (outputs, n_inst/secs)
+        print("{:>15}: {:>9} instructions in {:.3f}s ({:,.0f} inst/s) -> {}".format(
+            name,n_inst,secs,n_inst/secs,outputs))
+    # blocks run many instructions per _step, so reuse the interpreter's count
+    outputs, secs = time_jit(code,[2])
+    results["compiled blocks"] = (outputs, n_inst/secs)
+    print("{:>15}: {:>9} instructions in {:.3f}s ({:,.0f} inst/s) -> {}".format(
+        "compiled blocks",n_inst,secs,n_inst/secs,outputs))
+    baseline = results["legacy _step"]
+    for name in ["decoded _step","compiled blocks"]:
+        assert results[name][0] == baseline[0]
+        print("{} speedup: {:.2f}x".format(name,results[name][1]/baseline[1]))
+    for cached in [False,True]:
+        total, imported, loaded, step = cold_start(BOOST_INPUT,cached)
+        print("cold start, {}: {:.1f} ms to the first instruction (import {:.1f} ms, load {:.2f} ms, step {:.2f} ms)".format(
+            "cached" if cached else "parsed",total*1e3,imported*1e3,loaded*1e3,step*1e3))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Differential check of the compiled-block tier against the interpreter.
+
+Every Intcode puzzle input in the repository is run on two VMs, one plain
+and one with the JIT enabled. Whenever a VM stops for input both receive the
+same value (scripted inputs first, then draws from a seeded RNG over the
+inputs that day accepts). After every run the outputs, exit codes, program
+counters, relative bases and full memories must agree. A few small programs
+that read or jump to negative addresses check that both tiers raise the
+same error.
+
+Run from the repository root:
+    python -m intcode.differential
+"""
+import os
+import random
+import sys
+
+from .loader import load_program
+from .program import Program
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+P17_ROUTINE = [ord(c) for c in "A,B,A,C,B,C,B,A,C,B\nL,10,L,6,R,10\n"
+               "R,6,R,8,R,8,L,6,R,8\nL,10,R,8,R,8,L,10\nn\n"]
+
+# (name, input file or program, memory patches, scripted inputs, random input alphabet)
+CASES = [
+    ("p2 part 1", "p2/p2_input.txt", {1:12, 2:2}, [], None),
+    ("p5 part 1", "p5/p5_input.txt", {}, [1], None),
+    ("p5 part 2", "p5/p5_input.txt", {}, [5], None),
+    ("p7 amplifier", "p7/p7_input.txt", {}, [0, 0], None),
+    ("p7 feedback amplifier", "p7/p7_input.txt", {}, [5], range(-1000,1000)),
+    ("p9 part 1", "p9/p9_input.txt", {}, [1], None),
+    ("p9 part 2", "p9/p9_input.txt", {}, [2], None),
+    ("p11 painting robot", "p11/p11_input.txt", {}, [], (0,1)),
+    ("p13 part 1", "p13/p13_input.txt", {}, [], None),
+    ("p13 free play", "p13/p13_input.txt", {0:2}, [], (-1,0,1)),
+    ("p15 repair droid", "p15/p15_input.txt", {}, [], (1,2,3,4)),
+    ("p17 part 1", "p17/p17_input.txt", {}, [], None),
+    ("p17 part 2", "p17/p17_input.txt", {0:2}, P17_ROUTINE, None),
+    ("negative position read", [4,-1,99], {}, [], None),
+    ("negative relative read", [109,-5,204,0,99], {}, [], None),
+    ("negative relative write", [109,-1,203,0,99], {}, [7], None),
+    ("jump to negative address", [1105,1,-1,99], {}, [], None),
+]
+
+def load_code(fname):
+    return load_program(os.path.join(ROOT,fname))
+
+def _state(prog):
+    return prog.pos, prog.rel, prog.code.values()
+
+def _run(prog):
+    """
+    prog.run(), or ("raised", exception type, message) if it raised.
+    """
+    try:
+        return prog.run()
+    except (IndexError, ValueError) as e:
+        return "raised", type(e).__name__, str(e)
+
+def compare(code, scripted, alphabet, seed=0, max_inputs=500):
+    """
+    Run code on the interpreter and on the JIT in lockstep between inputs.
+    Return (number of inputs fed, jit block cache) if they agree, raise
+    AssertionError describing the first divergence otherwise.
+    """
+    ref = Program(code)
+    jit = Program(code)
+    jit.enable_jit()
+    rng = random.Random(seed)
+    scripted = list(scripted)
+    n_inputs = 0
+    while True:
+        ref_result = _run(ref)
+        jit_result = _run(jit)
+        if ref_result != jit_result:
+            raise AssertionError("after {} inputs: interpreter returned {}, jit returned {}".format(
+                n_inputs,ref_result,jit_result))
+        if ref_result[0] == "raised":
+            return n_inputs, jit.jit
+        if _state(ref) != _state(jit):
+            raise AssertionError("after {} inputs: VM state differs (pos {} vs {}, rel {} vs {})".format(
+                n_inputs,ref.pos,jit.pos,ref.rel,jit.rel))
+        if ref_result[0] == 1 or n_inputs >= max_inputs:
+            return n_inputs, jit.jit
+        if scripted:
+            value = scripted.pop(0)
+        elif alphabet is not None:
+            value = rng.choice(alphabet)
+        else:
+            raise AssertionError("program wants input but none is scripted")
+        ref.add_inputs([value])
+        jit.add_inputs([value])
+        n_inputs += 1
+
+def main():
+    failures = 0
+    for name, fname, patches, scripted, alphabet in CASES:
+        code = load_code(fname) if isinstance(fname,str) else list(fname)
+        for i,v in patches.items():
+            code[i] = v
+        try:
+            n_inputs, cache = compare(code,scripted,alphabet)
+        except AssertionError as e:
+            failures += 1
+            print("{:<24} MISMATCH {}".format(name,e))
+            continue
+        print("{:<24} ok ({} inputs, {} blocks compiled, {} invalidated, {} interpreted steps)".format(
+            name,n_inputs,cache.n_compiled,cache.n_invalidated,cache.n_fallback))
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
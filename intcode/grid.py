@@ -0,0 +1,158 @@
+"""
+Unbounded 2D grid stored as fixed-size NumPy tiles.
+
+The robots and droids driven by Intcode programs wander over a plane of
+unknown size. SparseGrid allocates a TILE x TILE block (optionally with
+several channels per cell, e.g. colour and painted flag) the first time a
+cell in it is written, keyed by tile coordinate, so memory grows with the
+area actually visited and nothing is ever copied to grow the grid.
+Coordinates are any signed (row, col) integers; reads of cells never
+written return the fill value without allocating.
+
+    grid = SparseGrid(channels=2, dtype=np.int8)
+    grid[-5, 3, 0] = 1        # one channel of a cell
+    grid[-5, 3]               # all channels of a cell, as an array
+    grid.count(1)             # cells with a nonzero value in channel 1
+    image, origin = grid.to_array(0)
+"""
+import numpy as np
+
+TILE_BITS = 5 # tiles are 32 x 32 cells
+
+class SparseGrid:
+    def __init__(self, channels=None, dtype=np.int64, fill=0, tile_bits=TILE_BITS):
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.fill = fill
+        self.bits = tile_bits
+        self.mask = (1 << tile_bits)-1
+        self.tile_shape = (1 << tile_bits, 1 << tile_bits) + ((channels,) if channels else ())
+        self.tiles = {} # (tile row, tile col) -> array of tile_shape
+
+    def _tile(self, r, c):
+        key = (r >> self.bits, c >> self.bits)
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = np.full(self.tile_shape,self.fill,dtype=self.dtype)
+            self.tiles[key] = tile
+        return tile
+
+    def __getitem__(self, key):
+        r, c = key[0], key[1]
+        tile = self.tiles.get((r >> self.bits, c >> self.bits))
+        if tile is None:
+            if len(key) == 2 and self.channels:
+                return np.full(self.channels,self.fill,dtype=self.dtype)
+            return self.dtype.type(self.fill)
+        mask = self.mask
+        return tile[(r & mask, c & mask) + tuple(key[2:])]
+
+    def __setitem__(self, key, value):
+        r, c = key[0], key[1]
+        mask = self.mask
+        self._tile(r,c)[(r & mask, c & mask) + tuple(key[2:])] = value
+
+    def clear(self):
+        self.tiles = {}
+
+    def copy(self):
+        grid = SparseGrid(self.channels,self.dtype,self.fill,self.bits)
+        grid.tiles = {k:t.copy() for k,t in self.tiles.items()}
+        return grid
+
+    @property
+    def nbytes(self):
+        return sum(t.nbytes for t in self.tiles.values())
+
+    def _set_cells(self, tile, channel):
+        """
+        Local (row, col) indices of the cells of a tile differing from the
+        fill value, in the given channel or in any channel.
+        """
+        if self.channels:
+            values = tile[:,:,channel] if channel is not None else tile
+        else:
+            values = tile
+        differs = values != self.fill
+        if values.ndim == 3:
+            differs = differs.any(axis=2)
+        return np.nonzero(differs)
+
+    def cells(self, channel=None):
+        """
+        Iterate over (row, col) of every cell differing from the fill value
+        (in channel, or in any channel), tile by tile.
+        """
+        size = 1 << self.bits
+        for (tr, tc), tile in self.tiles.items():
+            rows, cols = self._set_cells(tile,channel)
+            yield from zip((rows+tr*size).tolist(),(cols+tc*size).tolist())
+
+    def count(self, channel=None):
+        """
+        Number of cells differing from the fill value.
+        """
+        return sum(len(self._set_cells(t,channel)[0]) for t in self.tiles.values())
+
+    def bounds(self, channel=None):
+        """
+        (min row, max row, min col, max col) of the cells differing from the
+        fill value, or None if there are none.
+        """
+        size = 1 << self.bits
+        box = None
+        for (tr, tc), tile in self.tiles.items():
+            rows, cols = self._set_cells(tile,channel)
+            if len(rows) == 0:
+                continue
+            b = (tr*size+int(rows.min()), tr*size+int(rows.max()),
+                 tc*size+int(cols.min()), tc*size+int(cols.max()))
+            if box is None:
+                box = b
+            else:
+                box = (min(box[0],b[0]), max(box[1],b[1]), min(box[2],b[2]), max(box[3],b[3]))
+        return box
+
+    def to_array(self, channel=None, bounds=None):
+        """
+        Dense copy of the bounding box of the set cells (or of bounds, as
+        returned by bounds()). Return (array, (row, col) of its top left);
+        the array is empty if nothing is set. With channel, only that
+        channel is exported and also picks the bounding box.
+        """
+        if bounds is None:
+            bounds = self.bounds(channel)
+        if bounds is None:
+            shape = (0,0) + (self.tile_shape[2:] if channel is None else ())
+            return np.zeros(shape,dtype=self.dtype), (0,0)
+        r0, r1, c0, c1 = bounds
+        shape = (r1-r0+1, c1-c0+1) + (self.tile_shape[2:] if channel is None else ())
+        out = np.full(shape,self.fill,dtype=self.dtype)
+        size = 1 << self.bits
+        for tr in range(r0 >> self.bits, (r1 >> self.bits)+1):
+            for tc in range(c0 >> self.bits, (c1 >> self.bits)+1):
+                tile = self.tiles.get((tr,tc))
+                if tile is None:
+                    continue
+                if channel is not None:
+                    tile = tile[:,:,channel]
+                # overlap of the tile with the box, in grid coordinates
+                top, bottom = max(r0,tr*size), min(r1,tr*size+size-1)
+                left, right = max(c0,tc*size), min(c1,tc*size+size-1)
+                out[top-r0:bottom-r0+1, left-c0:right-c0+1] = \
+                    tile[top-tr*size:bottom-tr*size+1, left-tc*size:right-tc*size+1]
+        return out, (r0, c0)
+
+    @classmethod
+    def from_array(cls, array, origin=(0,0), channels=None, fill=0, tile_bits=TILE_BITS):
+        """
+        Grid holding a dense array with its top left cell at origin.
+        """
+        array = np.asarray(array)
+        if channels is None and array.ndim == 3:
+            channels = array.shape[2]
+        grid = cls(channels,array.dtype,fill,tile_bits)
+        r0, c0 = origin
+        for (r, c) in zip(*np.nonzero((array != fill).reshape(array.shape[:2]+(-1,)).any(axis=2))):
+            grid[r0+int(r), c0+int(c)] = array[r,c]
+        return grid
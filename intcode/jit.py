@@ -0,0 +1,247 @@
+"""
+Optional execution tier that compiles straight-line Intcode basic blocks into
+Python functions.
+
+A block starts at any address execution reaches and runs until the first
+jump, input, output or halt (inclusive), or until MAX_BLOCK instructions.
+Its source is generated with every opcode, mode and immediate parameter baked
+in, compiled once and cached by start address. Each call to a block has the
+same contract as Program._step: it returns (exit_code, output), producing at
+most one output, so callers cannot tell the difference except in speed.
+
+Intcode programs may overwrite their own code, so every write made by a
+compiled block checks whether it changes a value some block was built from;
+if so the affected blocks are dropped and the running block exits right
+after the write. Rewritten parameter cells (the programs use them for
+indirect addressing) are read at run time by blocks compiled afterwards, so
+they stop causing recompiles. Anything the compiler cannot handle (unknown
+opcodes or modes, blocks that keep getting invalidated) runs on the
+interpreter.
+
+Enable it with Program.enable_jit(); python -m intcode.differential checks
+it against the interpreter on every Intcode input in the repository.
+"""
+from .program import Program, decode
+
+MAX_BLOCK = 64 # longest run of instructions compiled into one block
+MAX_INVALIDATIONS = 8 # after this many recompiles, interpret the address instead
+
+_ARITH = {1:"+", 2:"*", 7:"<", 8:"=="}
+_WRITERS = {1:3, 2:3, 3:1, 7:3, 8:3} # instruction -> index of its write parameter
+
+class BlockCache:
+    """
+    Compiled blocks for one Program. step() is a drop-in replacement for
+    Program._step.
+    """
+    def __init__(self, vm):
+        self.vm = vm
+        self.mem = vm.code
+        self.blocks = {} # start address -> block function, or None to interpret
+        self.spans = {} # start address -> addresses whose values the block baked in
+        self.owners = {} # address -> set of start addresses of blocks built from it
+        self.recompiles = {} # start address -> times its block has been invalidated
+        self.dynamic = set() # addresses the program has rewritten, read at run time
+        self.n_compiled = 0
+        self.n_invalidated = 0
+        self.n_fallback = 0
+
+    def clear(self):
+        self.mem = self.vm.code
+        self.blocks = {}
+        self.spans = {}
+        self.owners = {}
+
+    def step(self):
+        vm = self.vm
+        if vm.code is not self.mem: # memory was swapped out, e.g. a save was loaded
+            self.clear()
+        pos = vm.pos
+        try:
+            block = self.blocks[pos]
+        except KeyError:
+            block = self._compile(pos)
+        if block is not None:
+            return block(vm)
+        return self._interpret()
+
+    def _interpret(self):
+        """
+        Execute a single instruction on the interpreter, keeping the cache
+        consistent with any write it makes.
+        """
+        vm = self.vm
+        self.n_fallback += 1
+        inst, modes = decode(vm.code[vm.pos])
+        target = None
+        if inst in _WRITERS:
+            k = _WRITERS[inst]
+            target = vm._get_val_idx(vm.pos+k,modes[k-1])
+            old = vm.code[target]
+        result = Program._step(vm)
+        if target is not None and target in self.owners and vm.code[target] != old:
+            self.invalidate(target)
+        return result
+
+    def invalidate(self, addr):
+        """
+        Drop every compiled block built from the value at addr. Blocks
+        compiled later read a parameter stored at addr at run time.
+        """
+        self.dynamic.add(addr)
+        for start in self.owners.pop(addr,()):
+            self.n_invalidated += 1
+            self.blocks.pop(start,None)
+            self.recompiles[start] = self.recompiles.get(start,0) + 1
+            for a in self.spans.pop(start,()):
+                if a != addr:
+                    self.owners[a].discard(start)
+                    if not self.owners[a]:
+                        del self.owners[a]
+
+    def _compile(self, start):
+        block = None
+        if self.recompiles.get(start,0) < MAX_INVALIDATIONS:
+            try:
+                src, baked = generate_source(self.mem,start,self.dynamic)
+                if src is not None:
+                    namespace = {"mem":self.mem, "data":self.mem.data,
+                                 "owners":self.owners, "invalidate":self.invalidate}
+                    exec(compile(src,"<intcode block {}>".format(start),"exec"),namespace)
+                    block = namespace["block"]
+                    self.spans[start] = baked
+                    for a in baked:
+                        self.owners.setdefault(a,set()).add(start)
+                    self.n_compiled += 1
+            except (ValueError, SyntaxError):
+                block = None
+        self.blocks[start] = block
+        return block
+
+def _operand(mem, loc, mode, lines, name, dynamic):
+    """
+    Emit the statements that load the parameter at loc into the local name,
+    and return name. Parameters at dynamic addresses are read at run time
+    instead of being baked into the source. Addresses computed at run time
+    outside the backing list go through Memory, like the interpreter's:
+    past the end reads 0, negative raises IndexError.
+    """
+    param = mem[loc]
+    if loc in dynamic and loc < len(mem.data):
+        if mode == 0:
+            lines.append("    t = data[{}]".format(loc))
+        elif mode == 1:
+            lines.append("    {} = data[{}]".format(name,loc))
+            return name
+        elif mode == 2:
+            lines.append("    t = rel+data[{}]".format(loc))
+        else:
+            raise ValueError("invalid parameter mode {}".format(mode))
+        lines.append("    {} = data[t] if 0 <= t < len(data) else mem[t]".format(name))
+        return name
+    if mode == 0: # position mode: address is fixed at compile time
+        if param < 0:
+            raise ValueError("negative address")
+        if param < len(mem.data):
+            lines.append("    {} = data[{}]".format(name,param))
+        else:
+            lines.append("    {} = mem[{}]".format(name,param))
+    elif mode == 1: # immediate mode
+        lines.append("    {} = {}".format(name,param))
+    elif mode == 2: # relative mode
+        lines.append("    t = rel+{}".format(param))
+        lines.append("    {} = data[t] if 0 <= t < len(data) else mem[t]".format(name))
+    else:
+        raise ValueError("invalid parameter mode {}".format(mode))
+    return name
+
+def _store(mem, loc, mode, value, next_pos, lines, dynamic):
+    """
+    Emit a write of the expression value to the address given by the
+    parameter at loc. Writes that change a value some compiled block was
+    built from invalidate those blocks and leave the current one.
+    """
+    if loc in dynamic and loc < len(mem.data):
+        param = "data[{}]".format(loc)
+    else:
+        param = mem[loc]
+    if mode == 0:
+        lines.append("    t = {}".format(param))
+    elif mode == 2:
+        lines.append("    t = rel+{}".format(param))
+    else:
+        raise ValueError("invalid mode {} for a write parameter".format(mode))
+    lines.append("    v = {}".format(value))
+    lines.append("    if t in owners and mem[t] != v:") # overwriting compiled code
+    lines.append("        mem[t] = v; vm.pos = {}; vm.rel = rel; invalidate(t)".format(next_pos))
+    lines.append("        return 0, None")
+    lines.append("    if 0 <= t < mem.size: data[t] = v")
+    lines.append("    else: mem[t] = v")
+
+def _emit(mem, pos, dynamic):
+    """
+    Emit the statements for the instruction at pos.
+    Return (lines, next position, whether the instruction ends the block).
+    Raise ValueError if it cannot be compiled.
+    """
+    inst, modes = decode(mem[pos])
+    lines = ["    # {}: {}".format(pos,mem[pos])]
+    if inst in _ARITH:
+        _operand(mem,pos+1,modes[0],lines,"a",dynamic)
+        _operand(mem,pos+2,modes[1],lines,"b",dynamic)
+        if inst in (1,2):
+            value = "a {} b".format(_ARITH[inst])
+        else:
+            value = "1 if a {} b else 0".format(_ARITH[inst])
+        _store(mem,pos+3,modes[2],value,pos+4,lines,dynamic)
+        return lines, pos+4, False
+    if inst == 9: # adjust rel
+        _operand(mem,pos+1,modes[0],lines,"a",dynamic)
+        lines.append("    rel += a")
+        return lines, pos+2, False
+    if inst == 3: # store input
+        lines += ["    if not vm.inputs:",
+                  "        vm.pos = {}; vm.rel = rel".format(pos),
+                  "        return 2, None"]
+        _store(mem,pos+1,modes[0],"vm.inputs.popleft()",pos+2,lines,dynamic)
+        lines += ["    vm.pos = {}; vm.rel = rel".format(pos+2), "    return 0, None"]
+        return lines, pos+2, True
+    if inst == 4: # output
+        _operand(mem,pos+1,modes[0],lines,"a",dynamic)
+        lines += ["    vm.pos = {}; vm.rel = rel".format(pos+2), "    return 0, a"]
+        return lines, pos+2, True
+    if inst in (5,6): # jump-if-true, jump-if-false
+        _operand(mem,pos+1,modes[0],lines,"a",dynamic)
+        _operand(mem,pos+2,modes[1],lines,"b",dynamic)
+        cond = "a != 0" if inst == 5 else "a == 0"
+        lines += ["    vm.pos = b if {} else {}; vm.rel = rel".format(cond,pos+3),
+                  "    return 0, None"]
+        return lines, pos+3, True
+    if inst == 99: # terminate
+        lines += ["    vm.pos = {}; vm.rel = rel".format(pos), "    return 1, None"]
+        return lines, pos+1, True
+    raise ValueError("invalid instruction {} at position {}".format(inst,pos))
+
+def generate_source(mem, start, dynamic=()):
+    """
+    Generate the source of a function `block(vm)` executing the basic block
+    starting at start. Return (source, addresses whose values were baked in),
+    or (None, ()) if not even the first instruction can be compiled.
+    """
+    lines = ["def block(vm):", "    rel = vm.rel"]
+    baked = []
+    pos = start
+    for _ in range(MAX_BLOCK):
+        try:
+            body, next_pos, ends_block = _emit(mem,pos,dynamic)
+        except ValueError: # stop before it, the interpreter will handle it
+            break
+        lines += body
+        baked += [a for a in range(pos,next_pos) if a == pos or a not in dynamic]
+        pos = next_pos
+        if ends_block:
+            return "\n".join(lines)+"\n", baked
+    if pos == start:
+        return None, ()
+    lines += ["    vm.pos = {}; vm.rel = rel".format(pos), "    return 0, None"]
+    return "\n".join(lines)+"\n", baked
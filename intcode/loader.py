@@ -0,0 +1,91 @@
+"""
+Load Intcode programs from their comma-separated input files.
+
+Parsing a program means an int() per value over a string split. The first
+time an input is loaded, its values are also written as a little-endian
+int64 array to a cache file named after the CRC-32 and length of the input
+text; later loads of the same text memory-map that file and copy the array
+out in one read instead of parsing. The cache file starts with a copy of
+the text it was made from, which is compared on load, so a hash collision
+can only cost a re-parse. (CRC-32 rather than hashlib keeps OpenSSL out of
+the import.) Programs with values that do not fit in int64, or a cache
+directory that cannot be written, are simply parsed every time.
+
+    from intcode import Program, load_program
+    vm = Program(load_program("p9_input.txt"))
+"""
+import array
+import mmap
+import os
+import sys
+import zlib
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),"__pycache__","programs")
+
+def parse_program(text):
+    """
+    List of ints from comma-separated Intcode text.
+    """
+    return [int(c) for c in text.strip().split(",")]
+
+def cache_path(raw, cache_dir=CACHE_DIR):
+    """
+    Cache file for the bytes of an input file.
+    """
+    return os.path.join(cache_dir,"{:08x}-{}.i64".format(zlib.crc32(raw),len(raw)))
+
+def _values_offset(n_text):
+    # 8 byte text length, the text, padding to a multiple of 8
+    return 8 + -(-n_text//8)*8
+
+def _read_cache(path, raw):
+    try:
+        with open(path,"rb") as f:
+            with mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as m:
+                n_text = int.from_bytes(m[:8],"little")
+                if n_text != len(raw) or m[8:8+n_text] != raw:
+                    return None
+                values = array.array("q")
+                values.frombytes(m[_values_offset(n_text):])
+    except (OSError, ValueError): # missing, unreadable, empty or truncated
+        return None
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tolist()
+
+def _write_cache(path, raw, code):
+    try:
+        values = array.array("q",code)
+    except OverflowError:
+        return
+    if sys.byteorder != "little":
+        values.byteswap()
+    tmp = "{}.{}.tmp".format(path,os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path),exist_ok=True)
+        with open(tmp,"wb") as f:
+            f.write(len(raw).to_bytes(8,"little"))
+            f.write(raw.ljust(_values_offset(len(raw))-8,b"\0"))
+            values.tofile(f)
+        os.replace(tmp,path) # readers never see a partial file
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def load_program(fname, cache_dir=CACHE_DIR):
+    """
+    Program in fname as a list of ints, from the binary cache if this text
+    has been loaded before. cache_dir=None disables the cache.
+    """
+    with open(fname,"rb") as f:
+        raw = f.read()
+    if cache_dir is None:
+        return parse_program(raw.decode("ascii"))
+    path = cache_path(raw,cache_dir)
+    code = _read_cache(path,raw)
+    if code is None:
+        code = parse_program(raw.decode("ascii"))
+        _write_cache(path,raw,code)
+    return code
@@ -0,0 +1,60 @@
+class Memory:
+    """
+    Flat Intcode memory. Addresses are stored contiguously in a list that
+    grows geometrically when a write lands past the end; reading past the end
+    returns 0 without allocating anything. Cells are plain Python ints, so
+    values that overflow int64 are held exactly.
+    """
+    __slots__ = ("data","size")
+
+    def __init__(self, values=()):
+        self.data = list(values)
+        self.size = len(self.data) # one past the highest address in use
+
+    def __getitem__(self, addr):
+        if addr < 0:
+            raise IndexError("negative address {}".format(addr))
+        try:
+            return self.data[addr]
+        except IndexError:
+            return 0
+
+    def __setitem__(self, addr, value):
+        data = self.data
+        if addr >= len(data):
+            self._grow(addr)
+        elif addr < 0:
+            raise IndexError("negative address {}".format(addr))
+        data[addr] = value
+        if addr >= self.size:
+            self.size = addr+1
+
+    def _grow(self, addr):
+        """
+        Extend the backing list so addr is valid, at least doubling capacity.
+        """
+        n = len(self.data)
+        self.data.extend([0]*(max(addr+1,2*n)-n))
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self.data[:self.size])
+
+    def __eq__(self, other):
+        if isinstance(other, Memory):
+            return self.values() == other.values()
+        return NotImplemented
+
+    def values(self):
+        """
+        All cells from address 0 to the highest address in use, in order.
+        """
+        return self.data[:self.size]
+
+    def copy(self):
+        mem = Memory()
+        mem.data = self.data[:]
+        mem.size = self.size
+        return mem
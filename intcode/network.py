@@ -0,0 +1,177 @@
+"""
+Cooperative scheduler for networks of Intcode VMs passing messages.
+
+Every VM added to a Network gets a bounded inbox (its input queue) and at
+most one destination: another node's inbox or a callable sink. The
+scheduler keeps a queue of runnable nodes and only ever resumes those:
+  - waiting for input (exit code 2) is a blocking receive, so the node
+    sleeps until something is sent to it;
+  - a node whose destination inbox is full is blocked on send and sleeps
+    until the receiver consumes input;
+  - a node that halts is never scheduled again, and becomes a sink: its
+    inbox takes any number of messages (kept for inspection, never read),
+    so nodes sending to it do not block.
+Each resume runs the VM with Program.run_until, capped at the free space in
+the destination, so a busy network costs time in proportion to the VMs
+actually doing work rather than to the number of VMs.
+
+Network.run() returns when nothing is runnable, reporting whether every VM
+halted, the network is idle (all live VMs waiting for input nobody will
+send) or deadlocked (a cycle of live VMs blocked on full inboxes).
+Network.serve() is the asyncio front end: it yields to the event loop
+between slices and, while the network is idle, waits for outside
+coroutines to send() it more input.
+"""
+import asyncio
+from collections import deque
+
+HALTED = "halted"
+IDLE = "idle"
+DEADLOCKED = "deadlocked"
+BUSY = "busy"
+
+class Channel:
+    """
+    Bounded FIFO feeding one VM's input queue. capacity=None is unbounded.
+    The queue is looked up through the node every time, since restoring a
+    VM from a snapshot replaces its input queue.
+    """
+    def __init__(self, node, capacity=None):
+        self.node = node
+        self.capacity = capacity
+
+    @property
+    def queue(self):
+        return self.node.vm.inputs
+
+    def space(self):
+        if self.capacity is None or self.node.halted: # a halted VM is a sink
+            return None
+        return max(self.capacity-len(self.queue),0)
+
+class Node:
+    def __init__(self, vm, capacity=None, name=None):
+        self.vm = vm
+        self.name = name
+        self.inbox = Channel(self,capacity)
+        self.dst = None # Node or callable receiving a list of outputs
+        self.senders = [] # nodes blocked on sending to this one
+        self.halted = False
+        self.queued = False
+
+    def __repr__(self):
+        return "Node({})".format(self.name)
+
+class Network:
+    def __init__(self):
+        self.nodes = []
+        self.ready = deque()
+        self.n_resumes = 0
+        self._wakeup = None
+
+    def add(self, vm, capacity=None, name=None):
+        """
+        Add a VM with an inbox of the given capacity. Return its node.
+        """
+        node = Node(vm,capacity,len(self.nodes) if name is None else name)
+        self.nodes.append(node)
+        self._schedule(node)
+        return node
+
+    def connect(self, src, dst):
+        """
+        Send src's outputs to dst, either a node or a callable taking a list
+        of values (use it to collect results or to route dynamically).
+        """
+        src.dst = dst
+
+    def send(self, node, values):
+        """
+        Put values in a node's inbox from outside the network, ignoring its
+        capacity, and wake it up.
+        """
+        node.inbox.queue.extend(values)
+        self._schedule(node)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _schedule(self, node):
+        if not node.queued and not node.halted:
+            node.queued = True
+            self.ready.append(node)
+
+    def _resume(self, node):
+        dst = node.dst
+        limit = dst.inbox.space() if isinstance(dst,Node) else None
+        if limit == 0: # blocked on send until dst consumes something
+            dst.senders.append(node)
+            return
+        self.n_resumes += 1
+        n_inputs = len(node.inbox.queue)
+        exit_code, outputs = node.vm.run_until(limit)
+        if outputs:
+            if isinstance(dst,Node):
+                dst.inbox.queue.extend(outputs)
+                self._schedule(dst)
+            elif dst is not None:
+                dst(outputs)
+        if exit_code == 1:
+            node.halted = True
+            for sender in node.senders: # nothing blocks on a sink
+                self._schedule(sender)
+            node.senders = []
+        elif exit_code == 0: # stopped at the output limit, try again
+            self._schedule(node)
+        # exit code 2: blocking receive, woken when something is sent to it
+        if len(node.inbox.queue) < n_inputs and node.senders:
+            for sender in node.senders:
+                self._schedule(sender)
+            node.senders = []
+
+    def status(self):
+        if self.ready:
+            return BUSY
+        if all(node.halted for node in self.nodes):
+            return HALTED
+        if any(node.senders for node in self.nodes if not node.halted):
+            return DEADLOCKED
+        return IDLE
+
+    def run(self, max_resumes=None):
+        """
+        Resume runnable VMs until none are left or max_resumes is reached.
+        Return the network status: halted, idle, deadlocked or busy.
+        """
+        ready = self.ready
+        n = 0
+        while ready and n != max_resumes:
+            node = ready.popleft()
+            node.queued = False
+            if not node.halted:
+                self._resume(node)
+            n += 1
+        return self.status()
+
+    async def serve(self, slice_size=64):
+        """
+        Run the network inside an asyncio event loop, yielding between
+        slices of slice_size resumes. While idle, wait for other coroutines
+        to send() input. Return once every VM has halted; raise RuntimeError
+        if the network deadlocks.
+        """
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                status = self.run(slice_size)
+                if status == HALTED:
+                    return status
+                if status == DEADLOCKED:
+                    raise RuntimeError("network deadlocked")
+                if status == BUSY:
+                    await asyncio.sleep(0)
+                else:
+                    self._wakeup.clear()
+                    if not self.ready:
+                        await self._wakeup.wait()
+        finally:
+            self._wakeup = None
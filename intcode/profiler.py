@@ -0,0 +1,166 @@
+"""
+Instrumentation for finding where an Intcode program spends its time.
+
+A Profiler records, for every instruction executed:
+  - how many times each opcode ran and the time spent in it,
+  - how many times each address was executed (hot loops show up as a few
+    addresses with very large counts),
+  - how many parameters were read or written in each addressing mode,
+and, per VM, the time spent executing versus sitting blocked on input
+(from the moment the VM asks for input until it is resumed).
+
+Profiling is switched on per VM with Program.enable_profiling(), which swaps
+in a separate step function the same way enable_jit() does; the plain
+interpreter loop contains no profiling code, so VMs that are not profiled
+run at full speed. Profiled VMs always run on the interpreter. Forks of a
+profiled VM report into the same Profiler, so a whole search can be
+profiled at once.
+
+Results come out as a text report, a JSON-friendly dict, or folded stacks
+("intcode;opcode;address count" lines) for flamegraph.pl and speedscope.
+
+Run from the repository root:
+    python -m intcode.profiler p9/p9_input.txt 2
+"""
+import json
+import sys
+from collections import Counter
+from time import perf_counter
+
+from .program import decode
+
+OPCODE_NAMES = {1:"add", 2:"mul", 3:"in", 4:"out", 5:"jnz", 6:"jz", 7:"lt", 8:"eq", 9:"arb", 99:"halt"}
+MODE_NAMES = {0:"position", 1:"immediate", 2:"relative"}
+N_PARAMS = {1:3, 2:3, 3:1, 4:1, 5:2, 6:2, 7:3, 8:3, 9:1, 99:0}
+
+class Profiler:
+    def __init__(self):
+        self.opcodes = Counter() # instruction -> times executed
+        self.opcode_seconds = Counter() # instruction -> seconds spent in it
+        self.addresses = Counter() # address -> times executed
+        self.modes = Counter() # addressing mode -> parameters accessed
+        self.executing = 0. # seconds spent executing instructions
+        self.blocked = 0. # seconds spent waiting for input
+        self.n_waits = 0 # times a VM stopped for input
+
+    def attach(self, vm):
+        """
+        Return a step function for vm, a drop-in replacement for its _step
+        that records into this profiler.
+        """
+        step = type(vm)._step
+        opcodes = self.opcodes
+        opcode_seconds = self.opcode_seconds
+        addresses = self.addresses
+        modes_seen = self.modes
+        blocked_since = None
+
+        def profiled_step():
+            nonlocal blocked_since
+            start = perf_counter()
+            if blocked_since is not None:
+                self.blocked += start-blocked_since
+                blocked_since = None
+            pos = vm.pos
+            inst, modes = decode(vm.code[pos])
+            exit_code, output = step(vm)
+            end = perf_counter()
+            self.executing += end-start
+            if exit_code == 2: # nothing was executed, the VM is now blocked
+                self.n_waits += 1
+                blocked_since = end
+                return exit_code, output
+            opcodes[inst] += 1
+            opcode_seconds[inst] += end-start
+            addresses[pos] += 1
+            for mode in modes[:N_PARAMS.get(inst,0)]:
+                modes_seen[mode] += 1
+            return exit_code, output
+
+        return profiled_step
+
+    @property
+    def n_instructions(self):
+        return sum(self.opcodes.values())
+
+    def as_dict(self, top=20):
+        """
+        Summary as plain dicts and lists, ready for json.dump. Only the top
+        hottest addresses are listed (all of them with top=None).
+        """
+        return {
+            "instructions": self.n_instructions,
+            "executing_seconds": self.executing,
+            "blocked_seconds": self.blocked,
+            "input_waits": self.n_waits,
+            "opcodes": {OPCODE_NAMES.get(inst,str(inst)):{"count":n, "seconds":self.opcode_seconds[inst]}
+                        for inst,n in self.opcodes.most_common()},
+            "modes": {MODE_NAMES.get(mode,str(mode)):n for mode,n in self.modes.most_common()},
+            "hot_addresses": [[addr,n] for addr,n in self.addresses.most_common(top)],
+        }
+
+    def to_json(self, fname=None, top=20):
+        """
+        Write the summary to fname as JSON, or return it as a string.
+        """
+        if fname is None:
+            return json.dumps(self.as_dict(top),indent=1)
+        with open(fname,"w") as f:
+            json.dump(self.as_dict(top),f,indent=1)
+
+    def folded(self, vm=None):
+        """
+        Folded stacks, one "intcode;opcode;address count" line per address,
+        weighted by instructions executed. Give the VM to name each address
+        by the opcode currently stored there; otherwise addresses are listed
+        under their own line.
+        """
+        lines = []
+        for addr, n in sorted(self.addresses.items()):
+            if vm is not None:
+                name = OPCODE_NAMES.get(decode(vm.code[addr])[0],"?")
+                lines.append("intcode;{};{} {}".format(name,addr,n))
+            else:
+                lines.append("intcode;{} {}".format(addr,n))
+        return "\n".join(lines)+"\n"
+
+    def report(self, top=10):
+        """
+        Human readable summary: time split, opcode table, addressing modes
+        and the hottest addresses.
+        """
+        n = self.n_instructions
+        total = self.executing+self.blocked
+        lines = ["{:,} instructions, {:.3f}s executing, {:.3f}s blocked on input ({} waits)".format(
+            n,self.executing,self.blocked,self.n_waits)]
+        if total > 0:
+            lines[0] += ", {:.0%} of the time executing".format(self.executing/total)
+        lines.append("{:>6} {:>12} {:>7} {:>9}".format("opcode","count","share","seconds"))
+        for inst, count in self.opcodes.most_common():
+            lines.append("{:>6} {:>12,} {:>7.1%} {:>9.3f}".format(
+                OPCODE_NAMES.get(inst,str(inst)),count,count/n,self.opcode_seconds[inst]))
+        n_params = sum(self.modes.values())
+        lines.append("parameter modes: "+", ".join("{} {:.1%}".format(MODE_NAMES.get(mode,str(mode)),k/n_params)
+                                                 for mode,k in self.modes.most_common()))
+        lines.append("hottest addresses:")
+        for addr, count in self.addresses.most_common(top):
+            lines.append("{:>8} {:>12,} {:>7.1%}".format(addr,count,count/n))
+        return "\n".join(lines)
+
+def main(argv):
+    """
+    Profile an Intcode file run with the given inputs until it halts or
+    runs out of input.
+    """
+    from .loader import load_program
+    from .program import Program
+    fname, inputs = argv[0], [int(v) for v in argv[1:]]
+    vm = Program(load_program(fname))
+    vm.add_inputs(inputs)
+    profiler = vm.enable_profiling()
+    exit_code, outputs = vm.run()
+    print("exit code {}, outputs {}".format(exit_code,outputs[-10:]))
+    print(profiler.report())
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,320 @@
+import copy
+from collections import deque
+
+from .memory import Memory
+
+# opcode value -> (instruction, (mode1, mode2, mode3))
+# keyed on the full opcode value rather than on the program counter, so a
+# self-modifying write can never leave a stale entry behind
+_DECODE_CACHE = {}
+
+def decode(opcode):
+    """
+    Parse an opcode into its instruction and a 3-tuple of parameter modes.
+    Missing modes are padded with 0 (position mode). Results are cached.
+    """
+    try:
+        return _DECODE_CACHE[opcode]
+    except KeyError:
+        pass
+    if opcode < 0:
+        raise ValueError("invalid opcode {}".format(opcode))
+    inst = opcode % 100
+    modes = (opcode//100 % 10, opcode//1000 % 10, opcode//10000 % 10)
+    _DECODE_CACHE[opcode] = (inst, modes)
+    return inst, modes
+
+class Program:
+    def __init__(self, code):
+        self.pos = 0 # position pointer
+        self.code = Memory(code)
+        self.rel = 0 # offset value for relative mode
+        self.inputs = deque()
+        self.n_steps = 0 # instructions executed by the interpreter
+
+    def add_inputs(self,inputs):
+        """
+        Queue inputs, consumed first in first out. Accepts any iterable of
+        integers, or a string, which is queued as its character codes.
+        """
+        if isinstance(inputs, str):
+            inputs = map(ord,inputs)
+        self.inputs.extend(inputs)
+
+    def run_until(self, n_outputs=None):
+        """
+        Run until n_outputs outputs have been produced, the program needs
+        input, or it halts, whichever comes first. With n_outputs=None only
+        input and halting stop execution.
+        Return (exit_code, outputs), where exit code 0 means the output limit
+        was reached and 1, 2 are as for _step.
+        Instructions run here are added to n_steps (a stop to wait for input
+        is not one); compiled blocks (see enable_jit) do not count theirs.
+        """
+        step = self._step
+        if getattr(step,"__func__",None) is not Program._step: # jit or a subclass
+            outputs = []
+            while True:
+                exit_code, output = step()
+                if output is not None:
+                    outputs.append(output)
+                    if len(outputs) == n_outputs:
+                        return 0, outputs
+                if exit_code:
+                    return exit_code, outputs
+
+        # interpreter loop with _step inlined
+        outputs = []
+        data = self.code.data
+        cache = _DECODE_CACHE
+        pos = self.pos
+        n = 0
+        try:
+            while True:
+                n += 1
+                # a raw list index would wrap a negative address to the end
+                # of memory; Memory raises for it, and reads 0 past the end
+                try:
+                    op = data[pos] if pos >= 0 else self.code[pos]
+                except IndexError:
+                    op = self.code[pos]
+                try:
+                    inst, modes = cache[op]
+                except KeyError:
+                    inst, modes = decode(op)
+                handler = _DISPATCH.get(inst)
+                if handler is None:
+                    raise ValueError("invalid instruction {} at position {}".format(inst,pos))
+                pos, exit_code, output = handler(self,pos,modes)
+                if output is not None:
+                    outputs.append(output)
+                    if len(outputs) == n_outputs:
+                        return 0, outputs
+                if exit_code:
+                    if exit_code == 2: # waiting for input executed nothing
+                        n -= 1
+                    return exit_code, outputs
+        finally:
+            self.pos = pos
+            self.n_steps += n
+
+    def run(self):
+        """
+        Run until the program needs input or halts.
+        Return (exit_code, outputs).
+        """
+        return self.run_until()
+
+    def snapshot(self):
+        """
+        Capture the VM state: (memory, position, relative base, pending
+        inputs). Memory is copied with a single list slice, which for
+        puzzle-sized programs costs microseconds and keeps the write path
+        free of copy-on-write checks.
+        """
+        return self.code.copy(), self.pos, self.rel, tuple(self.inputs)
+
+    def restore(self, snapshot):
+        """
+        Return the VM to a state captured by snapshot(). The snapshot is
+        left untouched and can be restored again.
+        """
+        mem, self.pos, self.rel, inputs = snapshot
+        self.code = mem.copy()
+        self.inputs = deque(inputs)
+
+    def fork(self):
+        """
+        Return an independent copy of this VM. Any other attributes (a
+        subclass's board, say) are shared with the original, not copied.
+        """
+        clone = copy.copy(self)
+        clone.code = self.code.copy()
+        clone.inputs = deque(self.inputs)
+        if getattr(self,"jit",None) is not None:
+            clone.enable_jit()
+        if getattr(self,"profiler",None) is not None: # report into the same profiler
+            clone._step = self.profiler.attach(clone)
+        return clone
+
+    def save(self, fname, **extras):
+        """
+        Write a binary snapshot of the VM plus any named extras (ints or
+        numpy arrays) to fname. See intcode.savestate for the format.
+        """
+        from . import savestate
+        savestate.save(fname,self,**extras)
+
+    def load(self, fname):
+        """
+        Restore the VM from a snapshot written by save(); return the extras.
+        """
+        from . import savestate
+        return savestate.load(fname,self)
+
+    def enable_jit(self):
+        """
+        Execute through compiled basic blocks (see intcode.jit) instead of
+        one instruction per _step call. Exit codes and outputs are unchanged.
+        A profiled VM stays on the interpreter and switches to the blocks
+        when profiling is disabled.
+        """
+        from .jit import BlockCache
+        self.jit = BlockCache(self)
+        if getattr(self,"profiler",None) is None:
+            self._step = self.jit.step
+
+    def disable_jit(self):
+        self.jit = None
+        if getattr(self,"profiler",None) is None: # keep the profiling hook
+            self.__dict__.pop("_step",None)
+
+    def enable_profiling(self, profiler=None):
+        """
+        Record opcode, address and addressing mode counts and time spent
+        executing versus blocked on input (see intcode.profiler), optionally
+        into an existing profiler. Profiled VMs run on the interpreter.
+        Return the Profiler.
+        """
+        from .profiler import Profiler
+        if profiler is None:
+            profiler = Profiler()
+        self.profiler = profiler
+        self._step = profiler.attach(self)
+        return profiler
+
+    def disable_profiling(self):
+        self.__dict__.pop("_step",None)
+        self.profiler = None
+        if getattr(self,"jit",None) is not None:
+            self.jit.clear() # the interpreter may have rewritten compiled code
+            self._step = self.jit.step
+
+    def _execute_loop(self):
+        return self.run()[1]
+
+    def _parse_opcode(self, opcode):
+        """
+        Parse an opcode, getting the parameter modes and instruction.
+        Opcode should be input as integer.
+        """
+        return decode(opcode)
+
+    def _get_val_idx(self,loc,mode):
+        if mode==0: # position mode
+            return self.code[loc]
+        elif mode==1: # immediate mode
+            return loc
+        elif mode==2: # relative mode
+            return self.rel+self.code[loc]
+        raise ValueError("invalid parameter mode {}".format(mode))
+
+    def _step(self):
+        """
+        Exit codes:
+           0 : continue execution
+           1 : program finished
+           2 : waiting for input
+        """
+        pos = self.pos # where are we in the code
+        inst, modes = decode(self.code[pos])
+        handler = _DISPATCH.get(inst)
+        if handler is None:
+            raise ValueError("invalid instruction {} at position {}".format(inst,pos))
+        self.pos, exit_code, output = handler(self,pos,modes)
+        if exit_code != 2: # waiting for input executes nothing
+            self.n_steps += 1
+        return exit_code, output
+
+    def _read(self,loc,mode):
+        """
+        Value of the parameter stored at loc, read straight from the backing
+        list; addresses outside it (past the end, or negative) go through
+        Memory indexing, which reads 0 or raises IndexError.
+        """
+        data = self.code.data
+        try:
+            if mode == 0: # position mode
+                addr = data[loc]
+            elif mode == 1: # immediate mode
+                return data[loc]
+            else: # relative mode
+                addr = self.rel+data[loc]
+            if addr >= 0: # a raw negative index would wrap to the end
+                return data[addr]
+        except IndexError:
+            pass
+        return self.code[self._get_val_idx(loc,mode)]
+
+    def _write(self,loc,mode,value):
+        """
+        Store value at the address given by the parameter at loc.
+        """
+        mem = self.code
+        addr = self._get_val_idx(loc,mode)
+        if 0 <= addr < mem.size:
+            mem.data[addr] = value
+        else:
+            mem[addr] = value
+
+    # instruction handlers: take the current position and decoded modes,
+    # return (new position, exit code, output)
+
+    def _add(self,pos,modes):
+        read = self._read
+        self._write(pos+3,modes[2],read(pos+1,modes[0]) + read(pos+2,modes[1]))
+        return pos+4, 0, None
+
+    def _multiply(self,pos,modes):
+        read = self._read
+        self._write(pos+3,modes[2],read(pos+1,modes[0]) * read(pos+2,modes[1]))
+        return pos+4, 0, None
+
+    def _store_input(self,pos,modes):
+        if not self.inputs: # must wait for additional input
+            return pos, 2, None
+        self._write(pos+1,modes[0],self.inputs.popleft())
+        return pos+2, 0, None
+
+    def _output(self,pos,modes):
+        return pos+2, 0, self._read(pos+1,modes[0])
+
+    def _jump_if_true(self,pos,modes):
+        if self._read(pos+1,modes[0]) != 0:
+            return self._read(pos+2,modes[1]), 0, None
+        return pos+3, 0, None
+
+    def _jump_if_false(self,pos,modes):
+        if self._read(pos+1,modes[0]) == 0:
+            return self._read(pos+2,modes[1]), 0, None
+        return pos+3, 0, None
+
+    def _less_than(self,pos,modes):
+        read = self._read
+        self._write(pos+3,modes[2],1 if read(pos+1,modes[0]) < read(pos+2,modes[1]) else 0)
+        return pos+4, 0, None
+
+    def _equals(self,pos,modes):
+        read = self._read
+        self._write(pos+3,modes[2],1 if read(pos+1,modes[0]) == read(pos+2,modes[1]) else 0)
+        return pos+4, 0, None
+
+    def _adjust_rel(self,pos,modes):
+        self.rel += self._read(pos+1,modes[0])
+        return pos+2, 0, None
+
+    def _terminate(self,pos,modes):
+        return pos, 1, None
+
+_DISPATCH = {
+    1: Program._add,
+    2: Program._multiply,
+    3: Program._store_input,
+    4: Program._output,
+    5: Program._jump_if_true,
+    6: Program._jump_if_false,
+    7: Program._less_than,
+    8: Program._equals,
+    9: Program._adjust_rel,
+    99: Program._terminate,
+}
@@ -0,0 +1,222 @@
+"""
+Record a SparseGrid as an animated GIF while a program runs.
+
+capture() only copies the grid's tiles and puts them on a bounded queue,
+so the caller pays a few small memcpys per frame. A background thread
+turns each snapshot into palette indices, works out the rectangle that
+changed since the previous frame and appends just that rectangle to the
+GIF, which is written as it goes ("do not dispose" frames paint over the
+previous one). The grid may grow in any direction while recording, so
+frames are placed in grid coordinates and the screen size and frame
+offsets are patched in when the file is closed.
+
+    with FrameRecorder("movie.gif",palette,colours) as recorder:
+        ...
+        recorder.capture(grid,marks=[(pos,4)])
+"""
+import queue
+import struct
+import threading
+
+import numpy as np
+
+from .grid import SparseGrid
+
+def lzw_encode(data, min_bits):
+    """
+    GIF flavoured LZW of a bytes object of colour indices < 2**min_bits.
+    """
+    clear = 1 << min_bits
+    end = clear+1
+    out = bytearray()
+    acc = 0 # bit accumulator, least significant bits first
+    n_acc = 0
+    width = min_bits+1
+    next_code = end+1
+    table = {}
+    acc |= clear << n_acc
+    n_acc += width
+    if not data:
+        acc |= end << n_acc
+        n_acc += width
+    else:
+        prefix = data[0]
+        for b in data[1:]:
+            key = (prefix << 8) | b
+            code = table.get(key)
+            if code is not None:
+                prefix = code
+                continue
+            acc |= prefix << n_acc
+            n_acc += width
+            if next_code < 4096:
+                table[key] = next_code
+                next_code += 1
+                # the decoder adds its entry one code later, so widen when it will
+                if next_code > (1 << width) and width < 12:
+                    width += 1
+            else: # table full: start again
+                acc |= clear << n_acc
+                n_acc += width
+                table = {}
+                width = min_bits+1
+                next_code = end+1
+            prefix = b
+            while n_acc >= 8:
+                out.append(acc & 0xff)
+                acc >>= 8
+                n_acc -= 8
+        acc |= prefix << n_acc
+        n_acc += width
+        acc |= end << n_acc
+        n_acc += width
+    while n_acc > 0:
+        out.append(acc & 0xff)
+        acc >>= 8
+        n_acc -= 8
+    return bytes(out)
+
+class GifWriter:
+    def __init__(self, fname, palette, delay=4, loop=0):
+        """
+        Animated GIF streamed to fname. palette is a list of (r, g, b), index
+        0 is the background; delay is per frame in hundredths of a second;
+        loop is the number of repeats, 0 for forever.
+        """
+        self.bits = max(2,int(np.ceil(np.log2(max(len(palette),2)))))
+        colours = list(palette) + [(0,0,0)]*((1 << self.bits)-len(palette))
+        self.delay = delay
+        self.n_frames = 0
+        self._placed = [] # (file offset of image descriptor, left, top)
+        self.bounds = None # (top, bottom, left, right) of everything drawn
+        self.f = open(fname,"wb")
+        self.f.write(b"GIF89a")
+        # logical screen size is patched on close
+        self.f.write(struct.pack("<HHBBB",0,0,0xf0 | (self.bits-1),0,0))
+        self.f.write(bytes(v for c in colours for v in c))
+        self.f.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H",loop) + b"\x00")
+
+    def add_frame(self, indices, top=0, left=0):
+        """
+        Paint a 2D array of palette indices with its top left cell at grid
+        position (top, left), which may be negative.
+        """
+        h, w = indices.shape
+        b = (top, top+h, left, left+w)
+        if self.bounds is None:
+            self.bounds = b
+        else:
+            self.bounds = (min(self.bounds[0],b[0]), max(self.bounds[1],b[1]),
+                           min(self.bounds[2],b[2]), max(self.bounds[3],b[3]))
+        f = self.f
+        # graphic control: do not dispose, delay
+        f.write(b"\x21\xf9\x04\x04" + struct.pack("<H",self.delay) + b"\x00\x00")
+        self._placed.append((f.tell(),left,top))
+        f.write(b"\x2c" + struct.pack("<HHHHB",0,0,w,h,0))
+        f.write(bytes([self.bits]))
+        data = lzw_encode(np.ascontiguousarray(indices,dtype=np.uint8).tobytes(),self.bits)
+        for i in range(0,len(data),255):
+            block = data[i:i+255]
+            f.write(bytes([len(block)]) + block)
+        f.write(b"\x00")
+        self.n_frames += 1
+
+    def close(self):
+        if self.f.closed:
+            return
+        f = self.f
+        f.write(b"\x3b")
+        top, bottom, left, right = self.bounds or (0,1,0,1)
+        if bottom-top > 0xffff or right-left > 0xffff:
+            raise ValueError("GIF frames span more than 65535 cells")
+        f.seek(6)
+        f.write(struct.pack("<HH",right-left,bottom-top))
+        for offset, l, t in self._placed:
+            f.seek(offset+1)
+            f.write(struct.pack("<HH",l-left,t-top))
+        f.close()
+
+class FrameRecorder:
+    def __init__(self, fname, palette, colours, delay=4, max_queued=64):
+        """
+        colours(tile) maps one grid tile to a 2D array of palette indices.
+        Up to max_queued snapshots wait for the encoder; capture() blocks
+        beyond that.
+        """
+        self.writer = GifWriter(fname,palette,delay)
+        self.colours = colours
+        self.n_captured = 0
+        self._queue = queue.Queue(max_queued)
+        self._previous = {} # tile key -> palette indices of the last frame
+        self._error = None
+        self._thread = threading.Thread(target=self._work,daemon=True)
+        self._thread.start()
+
+    def capture(self, grid, marks=()):
+        """
+        Queue a frame of grid; marks are ((row, col), palette index) drawn
+        on top, e.g. the position of a droid.
+        """
+        if self._error is not None:
+            raise self._error
+        tiles = {k:t.copy() for k,t in grid.tiles.items()}
+        self._queue.put((tiles,grid.bits,list(marks)))
+        self.n_captured += 1
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is None:
+                try:
+                    self._encode(*item)
+                except Exception as e:
+                    self._error = e
+
+    def _encode(self, tiles, bits, marks):
+        size = 1 << bits
+        mask = size-1
+        current = {k:np.array(self.colours(t),dtype=np.uint8) for k,t in tiles.items()}
+        for (r, c), colour in marks:
+            key = (r >> bits, c >> bits)
+            if key not in current:
+                current[key] = np.zeros((size,size),dtype=np.uint8)
+            current[key][r & mask, c & mask] = colour
+        # rectangle of cells that differ from the previous frame
+        blank = np.zeros((size,size),dtype=np.uint8)
+        box = None
+        for key in current.keys() | self._previous.keys():
+            rows, cols = np.nonzero(current.get(key,blank) != self._previous.get(key,blank))
+            if len(rows) == 0:
+                continue
+            b = (key[0]*size+int(rows.min()), key[0]*size+int(rows.max()),
+                 key[1]*size+int(cols.min()), key[1]*size+int(cols.max()))
+            if box is None:
+                box = b
+            else:
+                box = (min(box[0],b[0]), max(box[1],b[1]), min(box[2],b[2]), max(box[3],b[3]))
+        self._previous = current
+        if box is None: # nothing changed
+            return
+        frame = SparseGrid(dtype=np.uint8,tile_bits=bits)
+        frame.tiles = current
+        indices, (top, left) = frame.to_array(bounds=box)
+        self.writer.add_frame(indices,top,left)
+
+    def close(self):
+        """
+        Wait for the queued frames to be encoded and finish the file.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self.writer.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
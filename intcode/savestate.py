@@ -0,0 +1,195 @@
+"""
+Versioned binary snapshots of a Program plus arbitrary extra state (a game
+board, a score, ...).
+
+Layout (little endian, every array aligned to 8 bytes):
+  header   : magic b"INTC", version u16, reserved u16, pos i64, rel i64,
+             memory size u64, n_inputs u32, n_runs u32, n_big u32, n_extras u32
+  inputs   : n_inputs x i64, in consumption order
+  runs     : n_runs x (start u64, length u64), the address ranges stored
+  big      : n_big x (address u64, nbytes u32) followed by the signed
+             big-endian bytes of cells that do not fit in an i64
+  memory   : sum(lengths) x i64, the cells of each run in order
+             (cells listed in the big table hold 0 here)
+  extras   : n_extras x (name_len u16, name, kind u8, payload), where an
+             int payload is (nbytes u32, signed big-endian bytes) and an
+             array payload is (dtype_len u8, dtype, ndim u8, shape ndim x u64,
+             padding to 8, raw C-order bytes)
+
+Memory is split into runs wherever there is a long stretch of zeros, so
+sparse high addresses cost nothing and every stored cell keeps its address.
+load() maps the file copy-on-write: extra arrays come back as views of the
+mapping, so a board is not copied until it is written to.
+"""
+import mmap
+import struct
+
+import numpy as np
+
+from .memory import Memory
+
+MAGIC = b"INTC"
+VERSION = 1
+MIN_GAP = 64 # zero cells needed before memory is split into a new run
+
+_HEADER = struct.Struct("<4sHHqqQIIII")
+_RUN = struct.Struct("<QQ")
+_BIG = struct.Struct("<QI")
+_INT64_MIN, _INT64_MAX = -2**63, 2**63-1
+
+def _pad(n):
+    return -n % 8
+
+def _int_bytes(v):
+    return v.to_bytes((v.bit_length()+8)//8,"big",signed=True)
+
+def _encode_memory(values):
+    """
+    Split cell values into (start, length) runs separated by at least
+    MIN_GAP zeros. Return the runs, the (address, value) cells that do not
+    fit in an i64, and the i64 array of all run cells.
+    """
+    try:
+        arr = np.array(values,dtype="<i8")
+        big = []
+    except OverflowError:
+        big = [(a,v) for a,v in enumerate(values) if not _INT64_MIN <= v <= _INT64_MAX]
+        values = list(values)
+        for a, _ in big:
+            values[a] = 0
+        arr = np.array(values,dtype="<i8")
+    nonzero = np.union1d(np.flatnonzero(arr),[a for a,_ in big]).astype(np.int64)
+    if len(nonzero) == 0:
+        return [], big, arr[:0]
+    breaks = np.flatnonzero(np.diff(nonzero) > MIN_GAP)
+    starts = nonzero[np.concatenate(([0],breaks+1))]
+    ends = nonzero[np.concatenate((breaks,[len(nonzero)-1]))] + 1
+    runs = list(zip(starts.tolist(),(ends-starts).tolist()))
+    if len(runs) == 1:
+        cells = arr[starts[0]:ends[0]]
+    else:
+        cells = np.concatenate([arr[s:e] for s,e in zip(starts,ends)])
+    return runs, big, cells
+
+def dumps(vm, **extras):
+    """
+    Serialise vm (any Program) and the named extras (ints or numpy arrays).
+    """
+    values = vm.code.values()
+    runs, big, cells = _encode_memory(values)
+    inputs = list(vm.inputs)
+
+    parts = [_HEADER.pack(MAGIC,VERSION,0,vm.pos,vm.rel,len(values),len(inputs),len(runs),
+                          len(big),len(extras))]
+    parts.append(np.array(inputs,dtype="<i8").tobytes())
+    parts += [_RUN.pack(start,length) for start,length in runs]
+    for a, v in big:
+        b = _int_bytes(v)
+        parts += [_BIG.pack(a,len(b)), b]
+    n = sum(map(len,parts))
+    parts.append(b"\0"*_pad(n))
+    parts.append(cells.tobytes())
+    n = sum(map(len,parts))
+    for name, value in extras.items():
+        name = name.encode()
+        parts.append(struct.pack("<H",len(name))+name)
+        if isinstance(value, np.ndarray):
+            dtype = value.dtype.newbyteorder("<").str.encode()
+            head = struct.pack("<BB",1,len(dtype))+dtype+struct.pack("<B",value.ndim)
+            head += struct.pack("<{}Q".format(value.ndim),*value.shape)
+            n += 2+len(name)+len(head)
+            parts += [head, b"\0"*_pad(n)]
+            n += _pad(n)
+            data = np.ascontiguousarray(value,dtype=value.dtype.newbyteorder("<")).tobytes()
+        else:
+            b = _int_bytes(int(value))
+            data = struct.pack("<BI",0,len(b))+b
+            n += 2+len(name)
+        parts.append(data)
+        n += len(data)
+    return b"".join(parts)
+
+def loads(buf, vm):
+    """
+    Restore vm from a snapshot in buf (bytes, mmap, ...).
+    Return the extras as a dict; arrays are zero-copy views of buf.
+    """
+    (magic, version, _, pos, rel, size,
+     n_inputs, n_runs, n_big, n_extras) = _HEADER.unpack_from(buf,0)
+    if magic != MAGIC:
+        raise ValueError("not an Intcode snapshot")
+    if version != VERSION:
+        raise ValueError("unsupported snapshot version {}".format(version))
+    off = _HEADER.size
+    inputs = np.frombuffer(buf,dtype="<i8",count=n_inputs,offset=off).tolist()
+    off += 8*n_inputs
+    runs = [_RUN.unpack_from(buf,off+i*_RUN.size) for i in range(n_runs)]
+    off += n_runs*_RUN.size
+    big = []
+    for _ in range(n_big):
+        a, nbytes = _BIG.unpack_from(buf,off)
+        off += _BIG.size
+        big.append((a,int.from_bytes(buf[off:off+nbytes],"big",signed=True)))
+        off += nbytes
+    off += _pad(off)
+    n_cells = sum(length for _,length in runs)
+    cells = np.frombuffer(buf,dtype="<i8",count=n_cells,offset=off).tolist()
+    off += 8*n_cells
+
+    if n_cells == size: # one dense run from address 0
+        data = cells
+    else:
+        data = [0]*size
+        i = 0
+        for start, length in runs:
+            data[start:start+length] = cells[i:i+length]
+            i += length
+    for a, v in big:
+        data[a] = v
+    vm.code = Memory(data)
+    vm.pos = pos
+    vm.rel = rel
+    vm.inputs.clear()
+    vm.add_inputs(inputs)
+
+    extras = {}
+    for _ in range(n_extras):
+        (name_len,) = struct.unpack_from("<H",buf,off)
+        name = bytes(buf[off+2:off+2+name_len]).decode()
+        off += 2+name_len
+        kind = buf[off]
+        if kind == 0:
+            (nbytes,) = struct.unpack_from("<I",buf,off+1)
+            off += 5
+            extras[name] = int.from_bytes(buf[off:off+nbytes],"big",signed=True)
+            off += nbytes
+        else:
+            dtype_len = buf[off+1]
+            dtype = np.dtype(bytes(buf[off+2:off+2+dtype_len]).decode())
+            off += 2+dtype_len
+            ndim = buf[off]
+            shape = struct.unpack_from("<{}Q".format(ndim),buf,off+1)
+            off += 1+8*ndim
+            off += _pad(off)
+            count = int(np.prod(shape,dtype=np.int64))
+            extras[name] = np.frombuffer(buf,dtype=dtype,count=count,offset=off).reshape(shape)
+            off += count*dtype.itemsize
+    return extras
+
+def save(fname, vm, **extras):
+    with open(fname,"wb") as f:
+        f.write(dumps(vm,**extras))
+
+def load(fname, vm):
+    """
+    Restore vm from a snapshot file and return its extras. The file is
+    mapped copy-on-write, so extra arrays share pages with the file until
+    they are modified and never write back to it.
+    """
+    with open(fname,"rb") as f:
+        buf = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_COPY)
+    return loads(buf,vm)
+
+def is_snapshot(fname):
+    with open(fname,"rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
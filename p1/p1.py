@@ -1,24 +1,33 @@
 import numpy as np
+import os
 
 def get_fuel(mass):
     """
     Divide mass by 3, round down, subtract 2.
-    
+
     i.e. get_fuel(14)=2
     """
     return np.maximum(np.floor(mass/3)-2,0)
 
-# part 1
-masses = np.loadtxt("p1_input.txt")
-fuels = get_fuel(masses)
-print("Part 1 answer: {}".format(int(fuels.sum())))
+def total_fuel(masses):
+    return int(get_fuel(masses).sum())
+
+def total_fuel_with_fuel(masses):
+    """
+    Fuel for the masses, plus fuel for that fuel, and so on.
+    """
+    fuels = get_fuel(masses)
+    tot_fuels = np.zeros(fuels.shape)
+    while fuels.sum()>0:
+        tot_fuels += fuels
+        fuels = get_fuel(fuels)
+    return int(tot_fuels.sum())
+
+if __name__ == "__main__":
+    masses = np.loadtxt(os.path.join(os.path.dirname(os.path.abspath(__file__)),"p1_input.txt"))
 
+    # part 1
+    print("Part 1 answer: {}".format(total_fuel(masses)))
 
-# part 2
-masses = np.loadtxt("p1_input.txt")
-fuels = get_fuel(masses)
-tot_fuels = np.zeros(fuels.shape)
-while fuels.sum()>0:
-    tot_fuels += fuels
-    fuels = get_fuel(fuels)
-print("Part 2 answer: {}".format(int(tot_fuels.sum())))
\ No newline at end of file
+    # part 2
+    print("Part 2 answer: {}".format(total_fuel_with_fuel(masses)))
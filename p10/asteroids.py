@@ -0,0 +1,107 @@
+"""
+Asteroid visibility and laser sweep, vectorised with NumPy.
+
+Seen from a station, the offset (dr, dc) to another asteroid reduces to the
+direction (dr/g, dc/g) with g = gcd(dr, dc); two asteroids block each other
+exactly when they share a direction, and g orders them by distance along
+it. So:
+  - the asteroids visible from a station are its distinct directions,
+    counted by sorting integer direction keys, for a block of stations at
+    a time so memory stays at block_size x n. Offsets are bounded by the
+    size of the field, so the reduced direction of every possible offset
+    is computed once (one vectorised gcd over a lookup table) and blocks
+    just index into it;
+  - the laser destroys the nearest asteroid in every direction on its
+    first rotation, the second nearest on the second, and so on: rank each
+    asteroid within its direction by g, then order by (rotation, angle).
+No pair of asteroids is ever visited from Python.
+"""
+import numpy as np
+
+MAX_TABLE = 1 << 24 # largest direction lookup table, in entries
+
+def parse_field(text):
+    """
+    (row, col) coordinates of the asteroids ("#") in a map, row by row.
+    """
+    rows = [l.strip() for l in text.strip().split("\n")]
+    field = np.array([[c == "#" for c in r] for r in rows])
+    return np.argwhere(field)
+
+def _reduce(offsets):
+    """
+    Directions and distance multiples of an array of (dr, dc) offsets.
+    Zero offsets keep direction (0, 0).
+    """
+    g = np.gcd(offsets[...,0],offsets[...,1])
+    g_safe = np.where(g == 0,1,g)
+    return offsets//g_safe[...,None], g
+
+def _keys(directions, span):
+    """
+    One integer per direction, for directions with components in [-span, span].
+    """
+    return (directions[...,0]+span)*(2*span+1) + directions[...,1]+span
+
+def _direction_table(span):
+    """
+    Key of the reduced direction of every offset in [-span, span]^2,
+    indexed by the key of the offset itself.
+    """
+    r = np.arange(-span,span+1)
+    offsets = np.stack(np.meshgrid(r,r,indexing="ij"),axis=-1)
+    directions, _ = _reduce(offsets)
+    return _keys(directions,span).ravel().astype(np.int32)
+
+def visible_counts(coords, block_size=512):
+    """
+    Number of asteroids visible from each asteroid.
+    """
+    coords = np.asarray(coords,dtype=np.int64)
+    n = len(coords)
+    span = int(np.ptp(coords)) if n else 0
+    table = _direction_table(span) if (2*span+1)**2 <= MAX_TABLE else None
+    if table is not None:
+        point_keys = coords[:,0]*(2*span+1) + coords[:,1]
+        centre = span*(2*span+1) + span
+    counts = np.zeros(n,dtype=np.int64)
+    for start in range(0,n,block_size):
+        stations = coords[start:start+block_size]
+        if table is not None:
+            offset_keys = point_keys[None,:] - point_keys[start:start+block_size,None] + centre
+            keys = table[offset_keys]
+        else:
+            directions, _ = _reduce(coords[None,:,:]-stations[:,None,:])
+            keys = _keys(directions,span)
+        keys.sort(axis=1)
+        # distinct keys per row, minus the station's own (0, 0)
+        counts[start:start+block_size] = (np.diff(keys,axis=1) != 0).sum(axis=1)
+    return counts
+
+def best_station(coords, block_size=512):
+    """
+    (index of the asteroid seeing the most others, how many it sees).
+    """
+    counts = visible_counts(coords,block_size)
+    best = int(counts.argmax())
+    return best, int(counts[best])
+
+def vaporisation_order(coords, station):
+    """
+    Indices of the other asteroids in the order a laser at coords[station]
+    destroys them, rotating clockwise from straight up (decreasing row).
+    """
+    coords = np.asarray(coords,dtype=np.int64)
+    others = np.flatnonzero(np.arange(len(coords)) != station)
+    directions, g = _reduce(coords[others]-coords[station])
+    keys = _keys(directions,int(np.ptp(coords)))
+    # rotation in which each asteroid is hit: its rank by distance within its direction
+    by_direction = np.lexsort((g,keys))
+    sorted_keys = keys[by_direction]
+    new_group = np.concatenate(([True],sorted_keys[1:] != sorted_keys[:-1]))
+    group_start = np.maximum.accumulate(np.where(new_group,np.arange(len(keys)),0))
+    rotation = np.empty(len(keys),dtype=np.int64)
+    rotation[by_direction] = np.arange(len(keys))-group_start
+    # clockwise angle from up; exact directions are the tie-break for equal floats
+    angle = np.arctan2(directions[:,1],-directions[:,0]) % (2*np.pi)
+    return others[np.lexsort((keys,angle,rotation))]
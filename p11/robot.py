@@ -0,0 +1,93 @@
+"""
+Hull painting robot.
+
+The robot's panels live in a SparseGrid starting at (0, 0), so the hull can
+grow in any direction: channel 0 is the panel colour (0 black, 1 white) and
+channel 1 whether the robot has painted it.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+from intcode import Program, SparseGrid, savestate
+
+BLACK, WHITE = 0, 1
+
+class robot():
+    def __init__(self,code):
+        # channel 0 is the colour, channel 1 whether the panel was painted
+        self.canvas = SparseGrid(channels=2,dtype=np.int8)
+        self.pos = (0,0)
+        self.dir = 0
+        self.prog = Program(code)
+
+    def _advance(self,move):
+        if move == 0:
+            self.dir = (self.dir-1)%4
+        else:
+            self.dir = (self.dir+1)%4
+
+        if self.dir == 0: # move up
+            self.pos = (self.pos[0]-1,self.pos[1])
+        elif self.dir == 1: # move right
+            self.pos = (self.pos[0],self.pos[1]+1)
+        elif self.dir == 2: # move down
+            self.pos = (self.pos[0]+1,self.pos[1])
+        else: # move left
+            self.pos = (self.pos[0],self.pos[1]-1)
+
+    def save(self,fname):
+        """
+        Save the VM, position, heading and painted tiles as a binary snapshot.
+        """
+        keys = np.array(list(self.canvas.tiles),dtype=np.int64).reshape(-1,2)
+        tiles = np.zeros((0,)+self.canvas.tile_shape,dtype=self.canvas.dtype)
+        if self.canvas.tiles:
+            tiles = np.stack(list(self.canvas.tiles.values()))
+        savestate.save(fname,self.prog,row=self.pos[0],col=self.pos[1],dir=self.dir,
+                       tile_keys=keys,tiles=tiles)
+
+    def load(self,fname):
+        extras = savestate.load(fname,self.prog)
+        self.pos = (extras["row"],extras["col"])
+        self.dir = extras["dir"]
+        self.canvas.clear()
+        for (tr, tc), tile in zip(extras["tile_keys"].tolist(),extras["tiles"]):
+            self.canvas.tiles[(tr,tc)] = tile # copy-on-write view of the file
+
+    def paint(self):
+        """
+        Perform a painting step, feeding in the current panel color to the program,
+        getting the output and acting accordingly.
+        """
+        exit_code = 0
+        while exit_code != 1:
+            self.prog.add_inputs([int(self.canvas[self.pos[0],self.pos[1],0])])
+            # run the program until it needs input or finishes
+            exit_code, outputs = self.prog.run_until()
+            if len(outputs) == 2: # if we got 2 outputs, act
+                self.canvas[self.pos[0],self.pos[1],0] = outputs[0]
+                self.canvas[self.pos[0],self.pos[1],1] = 1
+                self._advance(outputs[1])
+
+def paint_hull(code, start=BLACK):
+    """
+    Run the robot to completion with the starting panel painted start.
+    """
+    r = robot(code)
+    if start != BLACK:
+        r.canvas[r.pos[0],r.pos[1],0] = start
+    r.paint()
+    return r
+
+def registration(r):
+    """
+    The white panels within their bounding box, as a 2D array.
+    """
+    image, _ = r.canvas.to_array(0)
+    return image
+
+def render(image):
+    return "\n".join("".join("#" if p == WHITE else " " for p in row) for row in image.tolist())
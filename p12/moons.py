@@ -0,0 +1,115 @@
+"""
+Vectorised N-body simulator for the Jupiter moons.
+
+The state of every system lives in one integer array of shape
+(2, bodies, systems, axes): positions in [0] and velocities in [1]. A step
+computes gravity for all bodies of all systems at once from broadcast sign
+differences, so its cost is a handful of NumPy calls however many systems
+are simulated together. Keeping bodies outermost makes the sum over other
+bodies an addition of whole contiguous (systems x axes) rows, so large
+batches run at memory speed.
+
+Axes never interact, and a step can be undone (so every state lies on a
+cycle), so the period of a system is the LCM of the first times each axis
+returns to its starting positions and velocities. periods() finds every
+axis of every system in a single run and takes the LCM with exact integers.
+"""
+import math
+import re
+
+import numpy as np
+
+def parse_positions(text):
+    """
+    Positions from lines like "<x=-1, y=0, z=2>".
+    """
+    return [[int(v) for v in re.findall(r"-?\d+",line)] for line in text.strip().split("\n")]
+
+class moon_simulator():
+    def __init__(self,positions,velocities=None):
+        """
+        positions is (bodies, axes) for one system or (systems, bodies,
+        axes) for a batch of independent systems; velocities default to 0.
+        """
+        positions = np.array(positions,dtype=np.int64)
+        self.batched = positions.ndim == 3
+        if not self.batched:
+            positions = positions[None]
+        n_systems, n_bodies, n_axes = positions.shape
+        self.state = np.zeros((2,n_bodies,n_systems,n_axes),dtype=np.int64)
+        self.state[0] = positions.transpose(1,0,2)
+        if velocities is not None:
+            velocities = np.array(velocities,dtype=np.int64).reshape(positions.shape)
+            self.state[1] = velocities.transpose(1,0,2)
+        self.pos = self.state[0]
+        self.vel = self.state[1]
+        self._diff = np.empty((n_bodies,n_bodies,n_systems,n_axes),dtype=np.int64)
+        self._pull = np.empty((n_bodies,n_systems,n_axes),dtype=np.int64)
+        self.n_steps = 0
+
+    def _step(self):
+        pos, diff, pull = self.pos, self._diff, self._pull
+        # diff[i,j] = sign(pos[j] - pos[i]): pull on body i towards body j
+        np.subtract(pos[None],pos[:,None],out=diff)
+        np.sign(diff,out=diff)
+        np.add.reduce(diff,axis=1,out=pull)
+        self.vel += pull
+        pos += self.vel
+
+    def step(self,n=1):
+        for _ in range(n):
+            self._step()
+        self.n_steps += n
+
+    def positions(self):
+        """
+        Positions as (systems, bodies, axes), or (bodies, axes) if not batched.
+        """
+        pos = self.pos.transpose(1,0,2)
+        return pos if self.batched else pos[0]
+
+    def velocities(self):
+        vel = self.vel.transpose(1,0,2)
+        return vel if self.batched else vel[0]
+
+    def get_total_energy(self):
+        """
+        Sum over bodies of potential (sum |position|) times kinetic (sum
+        |velocity|) energy; one value per system when batched.
+        """
+        energy = (np.abs(self.pos).sum(axis=-1)*np.abs(self.vel).sum(axis=-1)).sum(axis=0)
+        return energy if self.batched else int(energy[0])
+
+    def axis_periods(self,max_steps=None):
+        """
+        Steps until each axis of each system first returns to the current
+        state, as an int array of shape (systems, axes) (just (axes,) when
+        not batched). All axes are simulated together; the simulator is left
+        at the step where the last one came back. Axes that have not come
+        back within max_steps are 0.
+        """
+        start = self.state.copy()
+        periods = np.zeros(self.state.shape[2:],dtype=np.int64) # (systems, axes)
+        n = 0
+        while max_steps is None or n < max_steps:
+            self._step()
+            n += 1
+            back = (self.state == start).all(axis=(0,1))
+            if back.any():
+                periods[back & (periods == 0)] = n
+                if periods.all():
+                    break
+        self.n_steps += n
+        return periods if self.batched else periods[0]
+
+    def periods(self,max_steps=None):
+        """
+        Steps until each system first returns to its current state: the LCM
+        of its axis periods, as exact Python ints (None if an axis did not
+        come back within max_steps).
+        """
+        axis_periods = self.axis_periods(max_steps)
+        if not self.batched:
+            axis_periods = axis_periods[None]
+        result = [math.lcm(*map(int,p)) if p.all() else None for p in axis_periods]
+        return result if self.batched else result[0]
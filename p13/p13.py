@@ -1,218 +1,217 @@
-from collections import defaultdict
+"""
+Day 13 arcade cabinet.
+
+The cabinet is driven by a controller, any callable taking the cabinet and
+returning the joystick position (-1, 0 or 1) each time the game asks for
+input. keyboard() plays interactively (Windows only, it reads keys with
+msvcrt); autopilot() follows the ball with the paddle and plays headless.
+Rendering is optional: TerminalRenderer redraws only the tiles that changed,
+at most fps times a second.
+
+    python p13.py             interactive, asks whether to load a save
+    python p13.py headless    autopilot, no rendering, prints a speed report
+    python p13.py watch       autopilot with rendering
+"""
 import numpy as np
-from matplotlib import pyplot as plt
-import msvcrt
-import pickle
-class program():
-    def __init__(self, code):
-        self.pos = 0 # position pointer
-        self.code = defaultdict(lambda:0)
-        for i,v in enumerate(code):
-            self.code[i] = v
-        self.rel = 0 # offset value for relative mode
-        self.inputs = []
-        
-    def add_inputs(self,inputs):
-        for i in inputs:
-            self.inputs.insert(0,i)
-    
-    def run(self):
-        exit_code = 0
-        outputs = []
-        while exit_code == 0:
-            exit_code, output = self._step()
-            if output is not None:
-                outputs.append(output)
-        return exit_code, outputs
-    
-    def _parse_opcode(self, opcode):
-        """
-        Parse an opcode, getting the parameter modes and instruction.
-        Opcode should be input as integer.
-        """
-        code = str(opcode)
-        l = len(code)
-        inst = int(code[-2:])
-        modes = []
-        for i in range(l-2):
-            modes.append(int(code[l-3-i]))
-        return inst, modes
-    
-    def _get_val_idx(self,loc,mode):
-        if mode==0: # position mode
-            return self.code[loc]
-        elif mode==1: # immediate mode
-            return loc
-        elif mode==2: # relative mode
-            return self.rel+self.code[loc]
-        
-    def _step(self):
-        """
-        Exit codes: 
-           0 : continue execution
-           1 : program finished
-           2 : waiting for input
-        """
-        output = None
-        exit_code = 0
-        pos = self.pos # where are we in the code
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+from intcode import Memory, Program, load_program, savestate
+
+EMPTY, WALL, BLOCK, PADDLE, BALL = range(5)
+RENDER_SYMBOLS = ["  ","==","[]","--","()"]
+MOVES = {"a":-1,"d":1,"j":-1,"l":1,u"\u2192":1,u"\u2190":-1}
 
-        inst, modes = self._parse_opcode(self.code[pos])
-        if inst == 99: # terminate
-            exit_code = 1
-            
-        if inst == 1: # add
-            modes = modes+(3-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            self.code[self._get_val_idx(pos+3,modes[2])] = v1+v2 
-            pos += 4
-            
-        if inst == 2: # multiply
-            modes = modes+(3-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            self.code[self._get_val_idx(pos+3,modes[2])] = v1*v2 
-            pos += 4
-            
-        if inst == 3: # store input
-            try:
-                modes = modes + (1-len(modes))*[0]
-                self.code[self._get_val_idx(pos+1,modes[0])] = self.inputs.pop()
-                pos += 2
-            except IndexError: # must wait for additional input
-                exit_code = 2
-                
-        if inst == 4: # output value
-            modes = modes+(1-len(modes))*[0]
-            v = self.code[self._get_val_idx(pos+1,modes[0])]
-            output = v
-            pos += 2
-            
-        if inst == 5: # jump-if-true
-            modes = modes+(2-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            if v1 > 0:
-                pos = v2
-            else:
-                pos += 3
-                
-        if inst == 6: # jump-if-false
-            modes = modes+(2-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            if v1 == 0:
-                pos = v2
-            else:
-                pos += 3
-                
-        if inst == 7:
-            modes = modes+(3-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            if v1 < v2:
-                self.code[self._get_val_idx(pos+3,modes[2])] = 1
-            else:
-                self.code[self._get_val_idx(pos+3,modes[2])] = 0
-            pos += 4
-            
-        if inst == 8:
-            modes = modes+(3-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            if v1 == v2:
-                self.code[self._get_val_idx(pos+3,modes[2])] = 1
-            else:
-                self.code[self._get_val_idx(pos+3,modes[2])] = 0
-            pos += 4
-            
-        if inst == 9: # adjust rel
-            modes = modes+(1-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            self.rel += v1
-            pos += 2
-        self.pos = pos
-        return exit_code, output
-    
 class arcade_cabinet():
     def __init__(self,code):
-        self.prog = program(code)
-        self.board = np.zeros((26,40),dtype=np.int)
+        self.prog = Program(code)
+        self.board = np.zeros((26,40),dtype=np.uint8)
         self.score = 0
-        self.render_symbols = ["  ","==","[]","--","()"]
-        self.moves = defaultdict(lambda:0,{"a":-1,"d":1,"j":-1,"l":1,u"\u2192":1,u"\u2190":-1})
+        self.ball = None # (x, y) of the ball, tracked from the tile stream
+        self.paddle = None
+        self.dirty = set() # (y, x) of tiles changed since the last render
+        self.render_symbols = RENDER_SYMBOLS
         
+    def save_game(self,fname):
+        """
+        Save the VM, board and score as a binary snapshot.
+        """
+        self.prog.save(fname,board=self.board,score=self.score)
+
     def load_game(self,fname):
+        if savestate.is_snapshot(fname):
+            extras = self.prog.load(fname)
+            self.board = extras["board"] # copy-on-write view of the file
+            self.score = extras["score"]
+            self._locate_objects()
+            return
+        # older text saves
         with open(fname,"r") as f:
             self.prog.pos = int(f.readline().strip())
             saved_code = [int(c) for c in f.readline().strip().split(",")]
-            self.prog.code = defaultdict(lambda:0)
-            for i,c in enumerate(saved_code):
-                self.prog.code[i] = c
+            self.prog.code = Memory(saved_code)
             self.prog.rel = int(f.readline().strip())
             l = f.readline().strip().split(",")
-            if l[0] == "":
-                self.prog.inputs = []
-            else:
-                self.prog.inputs = [int(c) for c in l]
-            self.board = np.array([int(c) for c in f.readline().strip().split(",")],dtype=np.int).reshape((26,40))
+            self.prog.inputs.clear()
+            if l[0] != "":
+                self.prog.add_inputs([int(c) for c in l])
+            self.board = np.array([int(c) for c in f.readline().strip().split(",")],dtype=np.uint8).reshape((26,40))
             self.score = int(f.readline().strip())
+        self._locate_objects()
+
+    def _locate_objects(self):
+        """
+        Find the ball and paddle on a board that was loaded rather than drawn.
+        """
+        self.ball = self.paddle = None
+        for tile in (BALL, PADDLE):
+            found = np.argwhere(self.board == tile)
+            if len(found):
+                y, x = found[0]
+                if tile == BALL:
+                    self.ball = (int(x),int(y))
+                else:
+                    self.paddle = (int(x),int(y))
+        self.dirty = set()
     
     def render_board(self):
         """
         Create a string rendering of the game board.
         """
-        board_string = ""
-        for i in range(self.board.shape[0]):
-            for j in range(self.board.shape[1]):
-                board_string += self.render_symbols[self.board[i,j]]
-            board_string += "\n"
-        return board_string+"\nCurrent Score: {}".format(self.score)
-    
-    def run_program(self,render=False):
-        render_flag = False
+        symbols = self.render_symbols
+        rows = ["".join([symbols[t] for t in row])+"\n" for row in self.board.tolist()]
+        return "".join(rows)+"\nCurrent Score: {}".format(self.score)
+
+    def _draw_tiles(self,outputs):
+        """
+        Apply a batch of (x, y, tile) output triples to the board and score.
+        """
+        board = self.board
+        dirty = self.dirty
+        for i in range(0,len(outputs),3):
+            x, y, tile = outputs[i:i+3]
+            if x == -1:
+                self.score = tile
+                continue
+            board[y,x] = tile
+            dirty.add((y,x))
+            if tile == BALL:
+                self.ball = (x,y)
+            elif tile == PADDLE:
+                self.paddle = (x,y)
+
+    def run_program(self,controller=None,renderer=None):
+        """
+        Play until the program halts. The VM runs uninterrupted until it
+        needs input, then the tiles it drew are applied in one batch, the
+        renderer (if any) gets a chance to draw and the controller picks the
+        next move. controller defaults to keyboard.
+        Return a dict of frames (inputs read), instructions and seconds.
+        """
+        if controller is None:
+            controller = keyboard
+        prog = self.prog
+        pending = [] # a tile triple split across two runs
+        frames = 0
+        start_steps = prog.n_steps
+        start = time.perf_counter()
         while True:
-            outputs = []
-            while len(outputs) < 3:
-                exit_code, output = self.prog._step()
-                if exit_code == 1: # program halts
-                    return
-                if exit_code == 2: # needs input
-                    if not render_flag:
-                        print(self.render_board())
-                        render_flag = True
-                    move = msvcrt.getwch()
-                    if move == "q":
-                        print("saving")
-                        with open("saved_game.txt","w") as f:
-                            f.write(str(self.prog.pos)+"\n")
-                            f.write(",".join([str(c) for c in self.prog.code.values()]) + "\n")
-                            f.write(str(self.prog.rel)+"\n")
-                            f.write(",".join([str(c) for c in self.prog.inputs])+"\n")
-                            f.write(",".join([str(c) for c in self.board.flatten()])+"\n")
-                            f.write(str(self.score))
-                        move = msvcrt.getwch()
-                    self.prog.add_inputs([self.moves[move]])
-                if output is not None:
-                    outputs.append(output)
-            if outputs[0] == -1:
-                self.score = outputs[2]
-            else:
-                self.board[outputs[1],outputs[0]] = outputs[2]
-            if render and render_flag:
-                print(self.render_board())
-            
-load_game = input("Load game? (y/n)")
-if load_game == "y":
-    save_file = input("enter filename: ")
-    arcade = arcade_cabinet([])
-    arcade.load_game(save_file)
-    print(len(arcade.prog.code))
-    
-else:
-    with open("p13_input.txt","r") as f:
-        code = [int(c) for c in f.readline().strip().split(",")]
-    code[0] = 2
-    arcade = arcade_cabinet(code)
-arcade.run_program(render=True)
\ No newline at end of file
+            exit_code, outputs = prog.run_until()
+            if pending:
+                outputs = pending+outputs
+            n = len(outputs)-len(outputs)%3
+            self._draw_tiles(outputs[:n])
+            pending = outputs[n:]
+            if renderer is not None:
+                renderer.update(self,force=exit_code==1)
+            if exit_code == 1: # program halts
+                break
+            frames += 1
+            prog.add_inputs([controller(self)])
+        seconds = time.perf_counter()-start
+        return {"frames":frames, "instructions":prog.n_steps-start_steps, "seconds":seconds}
+
+def autopilot(arcade):
+    """
+    Move the paddle towards the ball's column.
+    """
+    if arcade.ball is None or arcade.paddle is None:
+        return 0
+    dx = arcade.ball[0]-arcade.paddle[0]
+    return (dx > 0)-(dx < 0)
+
+def keyboard(arcade):
+    """
+    Read a move from the keyboard; q saves the game and waits for a move.
+    """
+    import msvcrt # windows only
+    move = msvcrt.getwch()
+    if move == "q":
+        print("saving")
+        arcade.save_game("saved_game.sav")
+        move = msvcrt.getwch()
+    return MOVES.get(move,0)
+
+class TerminalRenderer():
+    """
+    Draw the board with ANSI escapes: the whole board on the first frame,
+    afterwards only the tiles that changed. Frames are drawn at most fps
+    times a second (fps=None draws every frame); changes made in between
+    are batched into the next one.
+    """
+    def __init__(self,stream=None,fps=30):
+        self.stream = sys.stdout if stream is None else stream
+        self.interval = 1/fps if fps else 0
+        self.last = None # time of the last frame drawn
+        self.score = None # score shown on screen
+        self.n_frames = 0
+
+    def update(self,arcade,force=False):
+        now = time.perf_counter()
+        if not force and self.last is not None and now-self.last < self.interval:
+            return
+        self.last = now
+        n_rows = arcade.board.shape[0]
+        if self.n_frames == 0:
+            out = ["\x1b[2J\x1b[H", arcade.render_board()]
+        else:
+            symbols = arcade.render_symbols
+            board = arcade.board
+            out = ["\x1b[{};{}H{}".format(y+1,2*x+1,symbols[board[y,x]]) for y,x in arcade.dirty]
+            if arcade.score != self.score:
+                out.append("\x1b[{};1H\x1b[KCurrent Score: {}".format(n_rows+2,arcade.score))
+        out.append("\x1b[{};1H".format(n_rows+3)) # park the cursor below the board
+        arcade.dirty.clear()
+        self.score = arcade.score
+        self.stream.write("".join(out))
+        self.stream.flush()
+        self.n_frames += 1
+
+def report(stats):
+    return "{} frames, {:,} instructions in {:.3f}s ({:,.0f} frames/s, {:,.0f} inst/s)".format(
+        stats["frames"],stats["instructions"],stats["seconds"],
+        stats["frames"]/stats["seconds"],stats["instructions"]/stats["seconds"])
+
+def new_game(fname="p13_input.txt"):
+    code = load_program(fname)
+    code[0] = 2 # free play
+    return arcade_cabinet(code)
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "play"
+    if mode in ("headless","watch"):
+        arcade = new_game()
+        renderer = TerminalRenderer() if mode == "watch" else None
+        stats = arcade.run_program(autopilot,renderer)
+        print("Final score: {}".format(arcade.score))
+        print(report(stats))
+    else:
+        load_game = input("Load game? (y/n)")
+        if load_game == "y":
+            save_file = input("enter filename: ")
+            arcade = arcade_cabinet([])
+            arcade.load_game(save_file)
+        else:
+            arcade = new_game()
+        arcade.run_program(keyboard,TerminalRenderer())
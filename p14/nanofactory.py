@@ -0,0 +1,145 @@
+"""
+Ore requirements for the space nanofactory.
+
+A nanofactory is built once from the parsed reactions: chemicals are put in
+topological order (FUEL first, ORE last) and every reaction becomes a list
+of (ingredient index, quantity) pairs. Working out the ore for any amount
+of fuel is then one pass over that order, O(chemicals + ingredients), with
+Python ints so nothing overflows however large the amounts get.
+
+Every amount of fuel costed is remembered, with its leftovers. ore_for is
+monotone in the fuel, so max_fuel starts its binary search from the
+tightest bracket already known; produce() keeps the leftovers of earlier
+runs and spends them first.
+"""
+from bisect import bisect_left
+
+def parse_reactions(text):
+    """
+    {chemical: ([(quantity, ingredient), ...], quantity produced)},
+    with ORE as a chemical with no reaction.
+    """
+    reactions = {}
+    for line in text.strip().split("\n"):
+        pre, post = line.strip().split("=>")
+        post_quant, post_chem = post.strip().split(" ")
+        reactions[post_chem] = ([(int(v.strip().split(" ")[0]), v.strip().split(" ")[1])
+                                 for v in pre.split(",")],
+                                int(post_quant))
+    reactions["ORE"] = ([],0)
+    return reactions
+
+def dfs(chem, reactions):
+    """
+    chem and everything it is made from, each chemical after all of its
+    ingredients (depth first post order, without recursion).
+    """
+    order = []
+    seen = set()
+    stack = [(chem, False)]
+    while stack:
+        c, finished = stack.pop()
+        if finished:
+            order.append(c)
+            continue
+        if c in seen:
+            continue
+        seen.add(c)
+        stack.append((c, True))
+        for _, dep in reactions[c][0]:
+            if dep not in seen:
+                stack.append((dep, False))
+    return order
+
+class nanofactory():
+    def __init__(self, reactions, target="FUEL"):
+        self.order = dfs(target,reactions)[::-1] # target first, ORE last
+        index = {chem:i for i,chem in enumerate(self.order)}
+        self.ore = index["ORE"]
+        self.batch = [reactions[chem][1] for chem in self.order]
+        self.ingredients = [[(index[dep], q) for q, dep in reactions[chem][0]] for chem in self.order]
+        self._costs = {} # fuel -> (ore, leftovers)
+        self._known = [] # sorted fuel amounts in _costs
+        self.stock = [0]*len(self.order) # leftovers kept by produce()
+
+    def _run(self, fuel, stock=None):
+        """
+        Make fuel, using stock (amounts by index) before running reactions.
+        Return (ore consumed, amounts left over).
+        """
+        need = [0]*len(self.order)
+        need[0] = fuel
+        left = list(stock) if stock is not None else [0]*len(self.order)
+        batch = self.batch
+        for i, deps in enumerate(self.ingredients):
+            if i == self.ore:
+                continue
+            n = need[i]-left[i]
+            if n <= 0:
+                left[i] = -n
+                continue
+            runs = -(-n // batch[i])
+            left[i] = runs*batch[i]-n
+            for j, q in deps:
+                need[j] += runs*q
+        return need[self.ore], left
+
+    def ore_for(self, fuel):
+        """
+        Ore needed to make fuel from scratch.
+        """
+        try:
+            return self._costs[fuel][0]
+        except KeyError:
+            pass
+        cost = self._run(fuel)
+        self._costs[fuel] = cost
+        self._known.insert(bisect_left(self._known,fuel),fuel)
+        return cost[0]
+
+    def leftovers(self, fuel):
+        """
+        {chemical: amount} left over after making fuel from scratch.
+        """
+        self.ore_for(fuel)
+        left = self._costs[fuel][1]
+        return {chem:left[i] for i,chem in enumerate(self.order) if left[i]}
+
+    def produce(self, fuel):
+        """
+        Make more fuel, spending leftovers from earlier produce() calls
+        first. Return the extra ore used.
+        """
+        ore, self.stock = self._run(fuel,self.stock)
+        return ore
+
+    def max_fuel(self, ore=10**12):
+        """
+        Largest amount of fuel that can be made from scratch with ore.
+        """
+        # bracket from amounts already costed: lo is affordable, hi is not
+        i = bisect_left(self._known,1)
+        lo = 0
+        hi = None
+        for fuel in self._known[i:]:
+            if self._costs[fuel][0] <= ore:
+                lo = fuel
+            else:
+                hi = fuel
+                break
+        if hi is None:
+            per_fuel = self.ore_for(1)
+            if per_fuel > ore:
+                return 0
+            # making fuel in bulk never costs more than one at a time
+            lo = max(lo,ore//per_fuel)
+            hi = max(2*lo,1)
+            while self.ore_for(hi) <= ore:
+                lo, hi = hi, 2*hi
+        while hi-lo > 1:
+            mid = (lo+hi)//2
+            if self.ore_for(mid) <= ore:
+                lo = mid
+            else:
+                hi = mid
+        return lo
@@ -1,147 +1,78 @@
-from collections import defaultdict
+from collections import deque
 import numpy as np
-from matplotlib import pyplot as plt
-import msvcrt
-import pickle
-class Program:
-    def __init__(self, code):
-        self.pos = 0 # position pointer
-        self.code = defaultdict(lambda:0)
-        for i,v in enumerate(code):
-            self.code[i] = v
-        self.rel = 0 # offset value for relative mode
-        self.inputs = []
-        
-    def add_inputs(self,inputs):
-        for i in inputs:
-            self.inputs.insert(0,i)
-    
-    def _parse_opcode(self, opcode):
-        """
-        Parse an opcode, getting the parameter modes and instruction.
-        Opcode should be input as integer.
-        """
-        code = str(opcode)
-        l = len(code)
-        inst = int(code[-2:])
-        modes = []
-        for i in range(l-2):
-            modes.append(int(code[l-3-i]))
-        return inst, modes
-    
-    def _get_val_idx(self,loc,mode):
-        if mode==0: # position mode
-            return self.code[loc]
-        elif mode==1: # immediate mode
-            return loc
-        elif mode==2: # relative mode
-            return self.rel+self.code[loc]
-        
-    def _step(self):
-        """
-        Exit codes: 
-           0 : continue execution
-           1 : program finished
-           2 : waiting for input
-        """
-        output = None
-        exit_code = 0
-        pos = self.pos # where are we in the code
+import itertools
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+from intcode import Program, SparseGrid, load_program
+from intcode.recorder import FrameRecorder
 
-        inst, modes = self._parse_opcode(self.code[pos])
-        if inst == 99: # terminate
-            exit_code = 1
-            
-        if inst == 1: # add
-            modes = modes+(3-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            self.code[self._get_val_idx(pos+3,modes[2])] = v1+v2 
-            pos += 4
-            
-        if inst == 2: # multiply
-            modes = modes+(3-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            self.code[self._get_val_idx(pos+3,modes[2])] = v1*v2 
-            pos += 4
-            
-        if inst == 3: # store input
-            try:
-                modes = modes + (1-len(modes))*[0]
-                self.code[self._get_val_idx(pos+1,modes[0])] = self.inputs.pop()
-                pos += 2
-            except IndexError: # must wait for additional input
-                exit_code = 2
-                
-        if inst == 4: # output value
-            modes = modes+(1-len(modes))*[0]
-            v = self.code[self._get_val_idx(pos+1,modes[0])]
-            output = v
-            pos += 2
-            
-        if inst == 5: # jump-if-true
-            modes = modes+(2-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            if v1 > 0:
-                pos = v2
-            else:
-                pos += 3
-                
-        if inst == 6: # jump-if-false
-            modes = modes+(2-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            if v1 == 0:
-                pos = v2
-            else:
-                pos += 3
-                
-        if inst == 7:
-            modes = modes+(3-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            if v1 < v2:
-                self.code[self._get_val_idx(pos+3,modes[2])] = 1
-            else:
-                self.code[self._get_val_idx(pos+3,modes[2])] = 0
-            pos += 4
-            
-        if inst == 8:
-            modes = modes+(3-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            v2 = self.code[self._get_val_idx(pos+2,modes[1])]
-            if v1 == v2:
-                self.code[self._get_val_idx(pos+3,modes[2])] = 1
-            else:
-                self.code[self._get_val_idx(pos+3,modes[2])] = 0
-            pos += 4
-            
-        if inst == 9: # adjust rel
-            modes = modes+(1-len(modes))*[0]
-            v1 = self.code[self._get_val_idx(pos+1,modes[0])]
-            self.rel += v1
-            pos += 2
-        self.pos = pos
-        return exit_code, output
+# maze recording: unvisited, wall, open, oxygen, droid
+MAZE_PALETTE = [(40,40,40), (200,200,200), (0,0,0), (0,120,255), (255,60,60)]
+DROID = 4
+
+def maze_colours(tile):
+    """
+    Palette indices of a board tile: 0 if unvisited, else tile type + 1.
+    """
+    return np.where(tile[:,:,1] == 1,tile[:,:,0]+1,0)
 
 class RepairDroid(Program):
     def __init__(self,code):
         super().__init__(code)
-        self.board = np.zeros((40,40,2),dtype=np.int)
-        self.board_pos = (20,20)
+        # channel 0 is the tile type, channel 1 whether it was visited
+        self.board = SparseGrid(channels=2,dtype=np.int8)
+        self.board_pos = (0,0)
         self.board[self.board_pos[0],self.board_pos[1],:] = 1
         self.moves = {"j":3, "k":2, "l":4, "i":1,"q":"q"}
         self.reverse_moves = {3:4, 4:3, 1:2, 2:1}
+        self.directions = {1:(-1,0), 2:(1,0), 3:(0,-1), 4:(0,1)} # north, south, west, east
         self.recursion_number = 0
-        self.plot_num = 0
-        self.plot = False
+        self.recorder = None
+        self.record_every = 5
         
+    def save(self,fname,**extras):
+        """
+        Binary snapshot of the VM together with the board and droid position.
+        """
+        board, (row0, col0) = self.board.to_array()
+        super().save(fname,board=board,board_row0=row0,board_col0=col0,
+                     board_row=self.board_pos[0],board_col=self.board_pos[1],**extras)
+
+    def load(self,fname):
+        extras = super().load(fname)
+        origin = (extras.pop("board_row0",0),extras.pop("board_col0",0))
+        self.board = SparseGrid.from_array(extras.pop("board"),origin)
+        self.board_pos = (extras.pop("board_row"),extras.pop("board_col"))
+        return extras
+
+    def start_recording(self,fname="maze_images/movie.gif",every=5,delay=4):
+        """
+        Stream the maze to an animated GIF while searching, a frame every
+        `every` steps of _search or explore. Frames are encoded in the
+        background; stop_recording() finishes the file.
+        """
+        self.recorder = FrameRecorder(fname,MAZE_PALETTE,maze_colours,delay)
+        self.record_every = every
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def _record(self,step,droid_pos=None):
+        if self.recorder is not None and step % self.record_every == 0:
+            droid_pos = self.board_pos if droid_pos is None else droid_pos
+            self.recorder.capture(self.board,marks=[(droid_pos,DROID)])
+
     def _render(self):
         render_string = ""
-        for i in range(self.board.shape[0]):
-            for j in range(self.board.shape[1]):
+        # everything visited, and the droid
+        bounds = self.board.bounds(1) or (self.board_pos[0],)*2 + (self.board_pos[1],)*2
+        top, bottom = min(bounds[0],self.board_pos[0]), max(bounds[1],self.board_pos[0])
+        left, right = min(bounds[2],self.board_pos[1]), max(bounds[3],self.board_pos[1])
+        for i in range(top,bottom+1):
+            for j in range(left,right+1):
                 if self.board_pos[0] == i and self.board_pos[1] == j: # droid is here
                     render_string += "v"
                     continue
@@ -172,39 +103,17 @@ class RepairDroid(Program):
             new_c += 1
         return (new_r, new_c)
     
-    def _expand_board_multiplicative(self):
-        # expand the size of the board, update the board position accordingly
-        # area of board increases 9-fold (each dimension multiplied by 3)
-        r, c, _ = self.board.shape
-        new_board = np.zeros((3*r,3*c,2),dtype=np.int)
-        new_board[r:2*r,c:2*c,:] = self.board
-        
-        self.board = new_board
-        self.board_pos = (r+self.board_pos[0],c+self.board_pos[1])
-    
-    def _expand_board_additive(self):
-        # increase the board size by adding a margin of size 10 around everything
-        r, c, _ = self.board.shape
-        new_board = np.zeros((r+20,c+20,2),dtype=np.int)
-        new_board[10:10+r,10:10+c,:] = self.board
-        
-        self.board = new_board
-        self.board_pos = (10+self.board_pos[0],10+self.board_pos[1])
-    
     def _execute_input(self,move):
         # feed the input
         self.add_inputs([move])
 
         # execute until more input needed:
-        out_code = 0
-        while out_code == 0:
-            out_code, out_val = self._step()
-            if out_val is not None:
-                output = out_val
-        return output
+        _, outputs = self.run_until()
+        return outputs[-1]
         
     
     def run_interactive(self):
+        import msvcrt # windows only
         while True:
             # render
             self._render()
@@ -218,9 +127,6 @@ class RepairDroid(Program):
             
             # update state
             new_pos = self._get_new_pos(move)
-            if new_pos[0] < 0 or new_pos[0] >= self.board.shape[0] or new_pos[1] < 0 or new_pos[1] >= self.board.shape[1]:
-                new_pos = (10+new_pos[0], 10+new_pos[1])
-                self._expand_board_additive()
             self.board[new_pos[0],new_pos[1],1] = 1 # I've visited this location
             self.board[new_pos[0],new_pos[1],0] = output
             if output > 0: # moved to new position
@@ -230,7 +136,7 @@ class RepairDroid(Program):
     def _search(self,current_depth, max_depth,halt_on_oxygen=True):
         """
         Recursively Search the neighbors of the current position until max_depth.
-        The board position should be the same at the beginning and end of the function call (unless board is expanded)
+        The board position should be the same at the beginning and end of the function call
         Moves: 1 = north, 2 = south, 3 = west, 4 = east.
         Return length of path to goal.
         Execute back move.
@@ -239,11 +145,7 @@ class RepairDroid(Program):
         self.recursion_number += 1
         dist_to_oxygen = np.inf
         
-        if self.recursion_number % 5 == 0 and self.plot:
-            self.plot_num += 1
-            plt.imshow(droid.board[:,:,0])
-            plt.savefig("maze_images/{}.png".format(self.plot_num))
-            plt.clf()
+        self._record(self.recursion_number)
         
         # set this position as visited
         self.board[self.board_pos[0],self.board_pos[1],1] = 1
@@ -255,13 +157,7 @@ class RepairDroid(Program):
             pass
         else: # recurse on neighbors
             for next_move in range(1,5):
-                # resize board if necessary
                 next_pos = self._get_new_pos(next_move)
-                if (next_pos[0] < 0 or next_pos[0] >= self.board.shape[0] 
-                    or next_pos[1] < 0 or next_pos[1] >= self.board.shape[1]):
-                    next_pos = (10+next_pos[0], 10+next_pos[1])
-                    self._expand_board_additive()
-                
                 
                 # skip neighboars that were already visited
                 if self.board[next_pos[0],next_pos[1],1] == 1: 
@@ -295,13 +191,70 @@ class RepairDroid(Program):
             if best_dist < np.inf:
                 return best_dist
             # reset visited nodes
-            self.board[:,:,:] = 0
+            self.board.clear()
             self.board[self.board_pos[0],self.board_pos[1],:] = 1
             
     def complete_search(self): # search the entire space (assuming bounded)
         return self._search(0,np.inf,halt_on_oxygen=True)
 
-with open("p15_input.txt","r") as f:
-    code = [int(c) for c in f.readline().strip().split(",")]
-droid = RepairDroid(code)
-droid.run_interactive()
\ No newline at end of file
+    def explore(self):
+        """
+        Map the whole maze with a breadth-first search from the current
+        position. Each frontier tile keeps a snapshot of the VM taken when
+        the droid reached it, so trying a neighbour is a restore plus one
+        move instead of walking the droid back and forth.
+        Fills in self.board and self.distances (offset from the start ->
+        number of moves) and returns the distance to the oxygen system, or
+        np.inf if it was not found. The droid ends up back at the start.
+        """
+        origin = self.board_pos
+        start = self.snapshot()
+        self.distances = {(0,0):0}
+        self.oxygen = None
+        frontier = deque([((0,0),start)])
+        n_expanded = 0
+        while frontier:
+            offset, state = frontier.popleft()
+            n_expanded += 1
+            self._record(n_expanded,(origin[0]+offset[0],origin[1]+offset[1]))
+            for move in range(1,5):
+                dr, dc = self.directions[move]
+                next_offset = (offset[0]+dr, offset[1]+dc)
+                idx = (origin[0]+next_offset[0], origin[1]+next_offset[1])
+                if self.board[idx[0],idx[1],1] == 1: # already explored
+                    continue
+                self.restore(state)
+                output = self._execute_input(move)
+                self.board[idx[0],idx[1],0] = output
+                self.board[idx[0],idx[1],1] = 1
+                if output == 0: # wall
+                    continue
+                self.distances[next_offset] = self.distances[offset] + 1
+                if output == 2:
+                    self.oxygen = next_offset
+                frontier.append((next_offset,self.snapshot()))
+        self.restore(start)
+        if self.oxygen is None:
+            return np.inf
+        return self.distances[self.oxygen]
+
+    def oxygen_fill_time(self):
+        """
+        Minutes for oxygen to fill the maze mapped by explore(): the largest
+        distance from the oxygen system to any open tile.
+        """
+        fill = {self.oxygen:0}
+        to_visit = deque([self.oxygen])
+        while to_visit:
+            pos = to_visit.popleft()
+            for dr, dc in self.directions.values():
+                next_pos = (pos[0]+dr, pos[1]+dc)
+                if next_pos in self.distances and next_pos not in fill:
+                    fill[next_pos] = fill[pos] + 1
+                    to_visit.append(next_pos)
+        return max(fill.values())
+
+if __name__ == "__main__":
+    code = load_program(os.path.join(os.path.dirname(os.path.abspath(__file__)),"p15_input.txt"))
+    droid = RepairDroid(code)
+    droid.run_interactive()
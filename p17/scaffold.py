@@ -0,0 +1,236 @@
+"""
+Scaffold map and movement routines for the vacuum robot.
+
+The camera view (the ASCII output of the program) is walked from the
+robot: go straight as far as the scaffold allows, then turn onto the only
+scaffold to the left or right, until there is none. Every intersection is
+crossed straight over, which gives the path as (turn, distance) moves.
+
+compress() splits that path into a main routine calling up to n_functions
+movement functions, every routine at most max_length characters once
+written out. Functions are defined in the order the main routine first
+calls them, so the search only has to choose, for each new function, where
+it is first called and how many moves it takes (longest first):
+  - with the functions defined so far fixed, every position they can reach
+    is found at once, with the fewest calls for each, instead of branching
+    on every call;
+  - positions from which even the shortest split into routines of
+    max_length characters would overrun the main routine are skipped;
+  - after its last call only the other functions are used, so the last
+    function must occur somewhere ending where they can finish the path;
+  - dead ends are remembered by (functions, position).
+The number of candidates still grows with the power of n_functions, but
+the puzzle's 3 functions of 20 characters take about a millisecond.
+"""
+import heapq
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+from intcode import Program
+
+SCAFFOLD = "#"
+ROBOT = {"^":(-1,0), "v":(1,0), "<":(0,-1), ">":(0,1)}
+MAX_FUNCTIONS = 3 # the robot reads exactly three function routines, A to C
+
+def camera_view(code):
+    """
+    Rows of the camera image printed by the program.
+    """
+    outputs = Program(code)._execute_loop()
+    return parse_view("".join(map(chr,outputs)))
+
+def parse_view(text):
+    return [row for row in text.strip().split("\n") if row]
+
+def alignment_sum(rows):
+    """
+    Sum of row * column over scaffold intersections.
+    """
+    arr = np.array([list(r) for r in rows]) == SCAFFOLD
+    cross = (arr[1:-1,1:-1] & arr[:-2,1:-1] & arr[2:,1:-1] & arr[1:-1,:-2] & arr[1:-1,2:])
+    i, j = np.nonzero(cross)
+    return int(((i+1)*(j+1)).sum())
+
+def scaffold_path(rows):
+    """
+    The robot's route over the whole scaffold as [(turn, distance), ...],
+    turns being "L" or "R".
+    """
+    h = len(rows)
+    def scaffold(r, c):
+        return 0 <= r < h and 0 <= c < len(rows[r]) and rows[r][c] == SCAFFOLD
+    for r, row in enumerate(rows):
+        for c, ch in enumerate(row):
+            if ch in ROBOT:
+                pos, d = (r, c), ROBOT[ch]
+                break
+        else:
+            continue
+        break
+    else:
+        raise ValueError("no robot in the camera view")
+    path = []
+    while True:
+        left = (-d[1], d[0])
+        right = (d[1], -d[0])
+        if scaffold(pos[0]+left[0],pos[1]+left[1]):
+            turn, d = "L", left
+        elif scaffold(pos[0]+right[0],pos[1]+right[1]):
+            turn, d = "R", right
+        else:
+            return path
+        n = 0
+        while scaffold(pos[0]+d[0],pos[1]+d[1]):
+            pos = (pos[0]+d[0], pos[1]+d[1])
+            n += 1
+        path.append((turn, n))
+
+def routine(moves):
+    """
+    Text of a movement function, e.g. "L,10,R,8".
+    """
+    return ",".join("{},{}".format(t,n) for t,n in moves)
+
+def compress(path, n_functions=MAX_FUNCTIONS, max_length=20):
+    """
+    (main routine, [function routines]) covering path, each at most
+    max_length characters, or None if there is no such split. Functions
+    are named A, B, C, ...
+    """
+    path = [tuple(m) for m in path]
+    n = len(path)
+    max_calls = (max_length+1)//2
+    # prefix_lengths[i]: move counts k such that path[i:i+k] fits in a function
+    prefix_lengths = []
+    for i in range(n):
+        ks = []
+        n_chars = -1
+        for k in range(i,n):
+            n_chars += 1+len(path[k][0])+1+len(str(path[k][1]))
+            if n_chars > max_length:
+                break
+            ks.append(k-i+1)
+        prefix_lengths.append(ks[::-1])
+    # fewest calls that could cover path[i:], whatever the functions are
+    at_least = [0]*(n+1)
+    for i in range(n-1,-1,-1):
+        at_least[i] = 1+min(at_least[i+k] for k in prefix_lengths[i])
+    occurrences = {} # moves -> set of positions where they start
+    failed = {} # (functions, start) -> fewest calls made when it failed
+
+    def occurs(moves):
+        found = occurrences.get(moves)
+        if found is None:
+            k = len(moves)
+            found = {i for i in range(n-k+1) if path[i] == moves[0] and tuple(path[i:i+k]) == moves}
+            occurrences[moves] = found
+        return found
+
+    def reachable(functions, start, calls):
+        """
+        {position: (fewest calls, previous position, function)} for the
+        positions reached from start by calling only the given functions.
+        """
+        where = [occurs(moves) for moves in functions]
+        reach = {start:(calls,None,None)}
+        heap = [start]
+        while heap:
+            i = heapq.heappop(heap)
+            c = reach[i][0]+1
+            if c > max_calls:
+                continue
+            for f, moves in enumerate(functions):
+                if i in where[f]:
+                    j = i+len(moves)
+                    if j not in reach:
+                        reach[j] = (c,i,f)
+                        heapq.heappush(heap,j)
+                    elif c < reach[j][0]:
+                        reach[j] = (c,i,f)
+        return reach
+
+    def finishing(functions):
+        """
+        Positions from which the end of the path is reached by calling only
+        the given functions.
+        """
+        starts = {} # position -> lengths of the functions starting there
+        for moves in functions:
+            for i in occurs(moves):
+                starts.setdefault(i,[]).append(len(moves))
+        done = {n}
+        for i in sorted(starts,reverse=True):
+            if any(i+k in done for k in starts[i]):
+                done.add(i)
+        return done
+
+    def calls_to(reach, i):
+        calls = []
+        while reach[i][1] is not None:
+            calls.append(reach[i][2])
+            i = reach[i][1]
+        return calls[::-1]
+
+    def search(functions, start, calls):
+        """
+        (calls covering path[start:], all functions) given that the
+        functions defined so far were called calls times to get to start,
+        or None.
+        """
+        key = (functions, start)
+        if failed.get(key,max_calls+1) <= calls:
+            return None
+        reach = reachable(functions,start,calls)
+        if n in reach:
+            return calls_to(reach,n), functions
+        if len(functions) < n_functions:
+            # after its last call the final function is never used again, so
+            # that call must end where the others can finish the path
+            done = finishing(functions) if len(functions) == n_functions-1 else None
+            # define the next function where it is first called
+            for i in sorted(reach,reverse=True):
+                c = reach[i][0]+1
+                if c+at_least[i]-1 > max_calls:
+                    continue
+                for k in prefix_lengths[i]:
+                    moves = tuple(path[i:i+k])
+                    if moves in functions:
+                        continue
+                    if done is not None and not any(j >= i and j+k in done for j in occurs(moves)):
+                        continue
+                    found = search(functions+(moves,),i+k,c)
+                    if found is not None:
+                        return calls_to(reach,i) + [len(functions)] + found[0], found[1]
+        failed[key] = calls
+        return None
+
+    found = search((),0,0)
+    if found is None:
+        return None
+    calls, functions = found
+    main = ",".join(chr(ord("A")+f) for f in calls)
+    return main, [routine(moves) for moves in functions]
+
+def movement_inputs(main, functions, video=False):
+    """
+    ASCII input for the robot: the main routine, every function (unused
+    ones empty) and the video feed answer.
+    """
+    if len(functions) > MAX_FUNCTIONS:
+        raise ValueError("the robot takes at most {} functions, got {}".format(MAX_FUNCTIONS,len(functions)))
+    lines = [main] + list(functions) + [""]*(MAX_FUNCTIONS-len(functions)) + ["y" if video else "n"]
+    return [ord(ch) for ch in "\n".join(lines)+"\n"]
+
+def dust_collected(code, main, functions):
+    """
+    Wake the robot up, feed it the routines and return the dust it reports.
+    """
+    code = list(code)
+    code[0] = 2
+    prog = Program(code)
+    prog.add_inputs(movement_inputs(main,functions))
+    outputs = prog._execute_loop()
+    return outputs[-1]
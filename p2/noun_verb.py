@@ -0,0 +1,224 @@
+"""
+Search for the (noun, verb) pair that makes a day 2 program leave a target
+value at address 0.
+
+Three methods, all returning the first match in (noun, verb) order:
+  "brute"    : runs intcode on a fresh copy of the parsed program per pair
+  "batch"    : runs every candidate at once, one NumPy lane per pair, in
+               lockstep; lanes whose opcodes diverge from the rest (the code
+               rewrote itself differently) or whose values could overflow
+               int64 finish on the scalar interpreter
+  "symbolic" : runs the program once with memory cells holding polynomials
+               in the noun and verb, then solves value[0] == target directly
+find_noun_verb tries symbolic first and falls back to batch if the program
+does something the symbolic run cannot follow (e.g. writes to an address
+that depends on the inputs).
+
+All three follow the same addressing rule: reading or writing an address
+outside the program (negative, or past the end) crashes the run, and a
+crashed pair never matches.
+"""
+from itertools import product
+
+import numpy as np
+
+from p2 import intcode
+
+SAFE_LIMIT = 2.0**62 # lanes whose values could reach this finish with exact ints
+
+def load_program(fname):
+    with open(fname,"r") as f:
+        return [int(c) for c in f.readline().split(",")]
+
+def run_pair(code, noun, verb):
+    """
+    Value left at address 0 for one (noun, verb), or None if the program
+    crashes.
+    """
+    mem = code[:]
+    mem[1] = noun
+    mem[2] = verb
+    try:
+        return intcode(mem)[0]
+    except IndexError:
+        return None
+
+def brute_force(code, target, nouns=range(100), verbs=range(100)):
+    for noun, verb in product(nouns,verbs):
+        if run_pair(code,noun,verb) == target:
+            return noun, verb
+    return None
+
+def run_batch(code, nouns, verbs):
+    """
+    Run one lane per (noun, verb) pair in lockstep.
+    Return an array of the values left at address 0; lanes that crashed
+    hold None (the array then has dtype object). Values are exact: a lane
+    whose next result could overflow int64 is finished on the scalar
+    interpreter instead.
+    """
+    nouns = np.asarray(nouns,dtype=np.int64)
+    verbs = np.asarray(verbs,dtype=np.int64)
+    n_lanes = len(nouns)
+    mem = np.tile(np.array(code,dtype=np.int64),(n_lanes,1))
+    mem[:,1] = nouns
+    mem[:,2] = verbs
+    size = mem.shape[1]
+    lanes = np.arange(n_lanes) # lanes still running in lockstep
+    results = np.zeros(n_lanes,dtype=object)
+    pos = 0
+    while len(lanes) > 0:
+        if pos >= size: # ran off the end: every lane still running crashes
+            results[lanes] = None
+            return results
+        if pos+3 >= size and mem[lanes[0],pos] != 99:
+            break # parameters past the end; the scalar run reports the crash
+        ops = mem[lanes,pos]
+        op = ops[0]
+        diverged = ops != op
+        if diverged.any(): # finish these lanes on the scalar interpreter
+            for lane in lanes[diverged]:
+                results[lane] = run_pair(code,int(nouns[lane]),int(verbs[lane]))
+            lanes = lanes[~diverged]
+        if op == 99:
+            results[lanes] = mem[lanes,0].tolist()
+            return results
+        if op not in (1,2):
+            break
+        a, b, c = mem[lanes,pos+1], mem[lanes,pos+2], mem[lanes,pos+3]
+        bad = (a < 0) | (a >= size) | (b < 0) | (b >= size) | (c < 0) | (c >= size)
+        if bad.any(): # out of range address: these lanes crash
+            results[lanes[bad]] = None
+            lanes, a, b, c = lanes[~bad], a[~bad], b[~bad], c[~bad]
+        va, vb = mem[lanes,a], mem[lanes,b]
+        # the float estimate is far from 2**63 wherever it is below SAFE_LIMIT
+        if op == 1:
+            big = np.abs(va.astype(np.float64)+vb) >= SAFE_LIMIT
+        else:
+            big = np.abs(va.astype(np.float64)*vb) >= SAFE_LIMIT
+        if big.any():
+            for lane in lanes[big]:
+                results[lane] = run_pair(code,int(nouns[lane]),int(verbs[lane]))
+            lanes, a, b, c, va, vb = lanes[~big], a[~big], b[~big], c[~big], va[~big], vb[~big]
+        mem[lanes,c] = va + vb if op == 1 else va * vb
+        pos += 4
+    for lane in lanes:
+        results[lane] = run_pair(code,int(nouns[lane]),int(verbs[lane]))
+    return results
+
+def batch_search(code, target, nouns=range(100), verbs=range(100), batch_size=10000):
+    pairs = list(product(nouns,verbs))
+    for i in range(0,len(pairs),batch_size):
+        batch = np.array(pairs[i:i+batch_size])
+        results = run_batch(code,batch[:,0],batch[:,1])
+        found = np.flatnonzero(results == target)
+        if len(found):
+            return pairs[i+found[0]]
+    return None
+
+# polynomials in (noun, verb) are dicts {(noun power, verb power): coefficient}
+
+def _poly_add(p, q):
+    r = dict(p)
+    for k,v in q.items():
+        r[k] = r.get(k,0) + v
+    return {k:v for k,v in r.items() if v != 0}
+
+def _poly_mul(p, q):
+    r = {}
+    for (i1,j1),v1 in p.items():
+        for (i2,j2),v2 in q.items():
+            k = (i1+i2,j1+j2)
+            r[k] = r.get(k,0) + v1*v2
+    return {k:v for k,v in r.items() if v != 0}
+
+def _constant(p):
+    """
+    Integer value of a constant polynomial, or None if it depends on the
+    inputs (or is unknown).
+    """
+    if p is None or any(k != (0,0) for k in p):
+        return None
+    return p.get((0,0),0)
+
+def symbolic_run(code, nouns=range(100), verbs=range(100)):
+    """
+    Run the program with noun and verb left as unknowns.
+    Return the polynomial at address 0, or None if the run depended on the
+    inputs in a way a polynomial cannot capture, or may crash.
+    A read from the noun or verb itself as an address gives an unknown
+    value (fine if it is never used) when every noun or verb is an address
+    in the program; any other read that could leave the program returns
+    None, so the batch run decides which pairs crash.
+    """
+    def addresses(values):
+        return len(values) == 0 or (min(values) >= 0 and max(values) < len(code))
+    inputs = {(1,0):addresses(nouns), (0,1):addresses(verbs)}
+    mem = [{(0,0):v} if v != 0 else {} for v in code]
+    mem[1] = {(1,0):1}
+    mem[2] = {(0,1):1}
+    pos = 0
+    while True:
+        op = _constant(mem[pos])
+        if op == 99:
+            return mem[0]
+        if op not in (1,2) or pos+3 >= len(mem):
+            return None
+        c = _constant(mem[pos+3])
+        if c is None or not 0 <= c < len(mem):
+            return None # symbolic or invalid write address
+        values = []
+        for k in (1,2):
+            param = mem[pos+k]
+            addr = _constant(param)
+            if addr is not None:
+                if not 0 <= addr < len(mem):
+                    return None # out of range read: the run crashes
+                values.append(mem[addr])
+            elif param in ({(1,0):1}, {(0,1):1}) and inputs[next(iter(param))]:
+                values.append(None)
+            else:
+                return None
+        va, vb = values
+        if va is None or vb is None:
+            mem[c] = None
+        elif op == 1:
+            mem[c] = _poly_add(va,vb)
+        else:
+            mem[c] = _poly_mul(va,vb)
+        pos += 4
+
+def symbolic_search(code, target, nouns=range(100), verbs=range(100)):
+    """
+    Solve value[0](noun, verb) == target. Raise ValueError if the symbolic
+    run fails.
+    """
+    poly = symbolic_run(code,nouns,verbs)
+    if poly is None:
+        raise ValueError("program is not a polynomial in noun and verb")
+    if all(i+j <= 1 for i,j in poly): # a*noun + b*verb + c
+        a = poly.get((1,0),0)
+        b = poly.get((0,1),0)
+        c = poly.get((0,0),0)
+        for noun in nouns:
+            rest = target - c - a*noun
+            if b == 0:
+                if rest == 0 and len(verbs) > 0:
+                    return noun, verbs[0]
+            elif rest % b == 0 and rest//b in verbs:
+                return noun, rest//b
+        return None
+    for noun, verb in product(nouns,verbs):
+        if sum(v * noun**i * verb**j for (i,j),v in poly.items()) == target:
+            return noun, verb
+    return None
+
+def find_noun_verb(code, target, nouns=range(100), verbs=range(100), method="symbolic"):
+    if method == "brute":
+        return brute_force(code,target,nouns,verbs)
+    if method == "symbolic":
+        try:
+            return symbolic_search(code,target,nouns,verbs)
+        except ValueError:
+            pass
+    return batch_search(code,target,nouns,verbs)
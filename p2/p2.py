@@ -1,5 +1,3 @@
-from itertools import product
-
 def intcode(code):
     """
     Execute the instructions given in the input code. 
@@ -11,6 +9,8 @@ def intcode(code):
             break
         else:
             codeblock = code[pos:pos+4]
+            if codeblock[0] in (1,2) and min(codeblock[1:],default=0) < 0:
+                raise IndexError("negative address at position {}".format(pos))
             if codeblock[0] == 1: # add
                 code[codeblock[-1]] = code[codeblock[1]] + code[codeblock[2]]
             if codeblock[0] == 2: # multiply
@@ -18,21 +18,16 @@ def intcode(code):
         pos += 4
     return code
 
-# part 1
-with open("p2_input.txt","r") as f:
-    incode = [int(c) for c in f.readline().split(",")]
-incode[1] = 12
-incode[2] = 2
-print("Part 1 answer: {}".format(intcode(incode)[0]))
+if __name__ == "__main__":
+    from noun_verb import find_noun_verb, load_program
 
+    # part 1
+    code = load_program("p2_input.txt")
+    incode = code[:]
+    incode[1] = 12
+    incode[2] = 2
+    print("Part 1 answer: {}".format(intcode(incode)[0]))
 
-# part 2
-for noun, verb in product(range(100),range(100)):
-    with open("p2_input.txt","r") as f:
-        incode = [int(c) for c in f.readline().split(",")]
-    incode[1] = noun
-    incode[2] = verb
-    val = intcode(incode)[0]
-    if val == 19690720:
-        break
-print(100*noun + verb)
\ No newline at end of file
+    # part 2
+    noun, verb = find_noun_verb(code,19690720)
+    print(100*noun + verb)
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Crossings between any number of wires, found with a sweep line.
+
+Wires are processed into horizontal and vertical segments by process_wire
+(same format as the notebook). Crossings come in two kinds:
+  - a horizontal segment of one wire crossing a vertical segment of
+    another: found by sweeping a vertical line across the plane. Horizontal
+    segments are inserted into a y-ordered active set when the line reaches
+    their left end and removed after their right end; each vertical segment
+    reports the active segments in its y range. That is O((n + k) log n)
+    for n segments and k crossings.
+  - two wires running along the same line: segments are grouped by their
+    row (or column), sorted by start and swept with a heap of end points,
+    so every overlapping stretch is reported once.
+Each crossing records the best Manhattan distance and combined step count
+over its points; the origin never counts.
+"""
+import heapq
+from bisect import bisect_left, insort
+
+def process_wire(wire):
+    """
+    Process the input wire into two data structures: ordered list of
+    vertical segments and ordered list of horizontal segments.
+    Each segment is ([low, high], fixed coordinate, direction, steps taken
+    before it), where direction 1 means it was travelled from high to low.
+    """
+    horz = []
+    vert = []
+    x_pos = 0
+    y_pos = 0
+    time = 0
+    for seg in wire.strip().split(","):
+        direction = seg[0]
+        offset = int(seg[1:])
+
+        if direction == "R":
+            horz.append(([x_pos,x_pos+offset],y_pos, 0, time))
+            x_pos += offset
+        if direction == "L":
+            horz.append(([x_pos-offset,x_pos],y_pos, 1, time))
+            x_pos -= offset
+        if direction == "U":
+            vert.append(([y_pos,y_pos+offset],x_pos, 0, time))
+            y_pos += offset
+        if direction == "D":
+            vert.append(([y_pos-offset,y_pos],x_pos, 1, time))
+            y_pos -= offset
+        time += offset
+    return horz, vert
+
+class _SortedList:
+    """
+    Sorted list of ints kept in blocks of at most 2*LOAD items, so inserting
+    or removing costs a bisect plus a short shift instead of moving the
+    whole list.
+    """
+    LOAD = 256
+
+    def __init__(self):
+        self.blocks = []
+        self.maxes = []
+
+    def add(self, value):
+        if not self.blocks:
+            self.blocks.append([value])
+            self.maxes.append(value)
+            return
+        i = bisect_left(self.maxes,value)
+        if i == len(self.maxes):
+            i -= 1
+            self.blocks[i].append(value)
+            self.maxes[i] = value
+        else:
+            insort(self.blocks[i],value)
+        block = self.blocks[i]
+        if len(block) > 2*self.LOAD: # split it in half
+            self.blocks.insert(i+1,block[self.LOAD:])
+            del block[self.LOAD:]
+            self.maxes.insert(i,block[-1])
+
+    def remove(self, value):
+        i = bisect_left(self.maxes,value)
+        block = self.blocks[i]
+        del block[bisect_left(block,value)]
+        if block:
+            self.maxes[i] = block[-1]
+        else:
+            del self.blocks[i]
+            del self.maxes[i]
+
+    def irange(self, low, high):
+        """
+        Values v with low <= v <= high, in order.
+        """
+        i = bisect_left(self.maxes,low)
+        j = bisect_left(self.blocks[i],low) if i < len(self.blocks) else 0
+        while i < len(self.blocks):
+            for value in self.blocks[i][j:]:
+                if value > high:
+                    return
+                yield value
+            i += 1
+            j = 0
+
+def _segments(wires):
+    """
+    Flatten processed wires into horizontal and vertical segment lists of
+    (low, high, fixed coordinate, start coordinate, steps before, wire).
+    """
+    horz = []
+    vert = []
+    for w, (h, v) in enumerate(wires):
+        for out, segs in ((horz, h), (vert, v)):
+            for (lo, hi), fixed, direction, time in segs:
+                out.append((lo, hi, fixed, hi if direction else lo, time, w))
+    return horz, vert
+
+def _perpendicular(horz, vert):
+    """
+    Yield (horizontal index, vertical index) for every crossing pair.
+    """
+    n = len(horz)
+    # (x, 0, h) inserts, (x, 1, v) queries, (x, 2, h) removals: ends are inclusive
+    events = [(s[0], 0, i) for i, s in enumerate(horz)]
+    events += [(s[1], 2, i) for i, s in enumerate(horz)]
+    events += [(s[2], 1, i) for i, s in enumerate(vert)]
+    events.sort()
+    active = _SortedList() # y*n + index, ordered by y
+    for _, kind, i in events:
+        if kind == 0:
+            active.add(horz[i][2]*n+i)
+        elif kind == 2:
+            active.remove(horz[i][2]*n+i)
+        else:
+            lo, hi = vert[i][0], vert[i][1]
+            for key in active.irange(lo*n,hi*n+n-1):
+                yield key % n, i
+
+def _collinear(segs):
+    """
+    Yield (index, index, low, high) for every pair of segments on the same
+    line that overlap on [low, high].
+    """
+    lines = {}
+    for i, s in enumerate(segs):
+        lines.setdefault(s[2],[]).append(i)
+    for members in lines.values():
+        if len(members) < 2 or len({segs[i][5] for i in members}) < 2:
+            continue
+        members.sort(key=lambda i: segs[i][0])
+        active = [] # heap of (high, index)
+        for i in members:
+            lo, hi = segs[i][0], segs[i][1]
+            while active and active[0][0] < lo:
+                heapq.heappop(active)
+            for other_hi, j in active:
+                yield j, i, lo, min(hi,other_hi)
+            heapq.heappush(active,(hi,i))
+
+def _steps(seg, p):
+    return seg[4] + abs(p-seg[3])
+
+def crossings(wires):
+    """
+    Every crossing between two different wires, as tuples
+    (wire a, wire b, (x0, y0), (x1, y1), distance, steps) with a < b.
+    A single point has (x0, y0) == (x1, y1); a stretch where the wires run
+    together spans from one end to the other. distance and steps are the
+    smallest Manhattan distance and combined step count over its points,
+    excluding the origin. wires is a list of process_wire outputs.
+    """
+    horz, vert = _segments(wires)
+    for h, v in _perpendicular(horz,vert):
+        sh, sv = horz[h], vert[v]
+        if sh[5] == sv[5]:
+            continue
+        x, y = sv[2], sh[2]
+        if x == 0 and y == 0:
+            continue
+        a, b = sorted((sh[5], sv[5]))
+        yield a, b, (x,y), (x,y), abs(x)+abs(y), _steps(sh,x)+_steps(sv,y)
+    for segs, horizontal in ((horz, True), (vert, False)):
+        for i, j, lo, hi in _collinear(segs):
+            si, sj = segs[i], segs[j]
+            if si[5] == sj[5]:
+                continue
+            fixed = si[2]
+            # both step counts are linear along the stretch and the distance
+            # is smallest nearest 0, so these points cover every minimum
+            candidates = {lo, hi, min(max(0,lo),hi)}
+            if fixed == 0:
+                candidates |= {p for p in (-1, 1) if lo <= p <= hi}
+                candidates.discard(0)
+            if not candidates:
+                continue
+            dist = min(abs(p) for p in candidates) + abs(fixed)
+            steps = min(_steps(si,p)+_steps(sj,p) for p in candidates)
+            start, end = ((lo,fixed), (hi,fixed)) if horizontal else ((fixed,lo), (fixed,hi))
+            a, b = sorted((si[5], sj[5]))
+            yield a, b, start, end, dist, steps
+
+def closest_by_pair(wires):
+    """
+    {(wire a, wire b): (smallest distance, smallest combined steps)} over
+    the crossings of each pair of wires that cross.
+    """
+    best = {}
+    for a, b, _, _, dist, steps in crossings(wires):
+        if (a, b) in best:
+            d, s = best[a,b]
+            best[a,b] = (min(d,dist), min(s,steps))
+        else:
+            best[a,b] = (dist, steps)
+    return best
+
+def closest(wires):
+    """
+    Smallest distance and smallest combined steps over all crossings, or
+    (None, None) if no two wires cross.
+    """
+    best = closest_by_pair(wires).values()
+    if not best:
+        return None, None
+    return min(d for d,_ in best), min(s for _,s in best)
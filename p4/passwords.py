@@ -0,0 +1,134 @@
+"""
+Counting passwords in a range with a digit DP.
+
+A password is a positive integer whose decimal digits satisfy some of:
+  - monotonic: digits never decrease from left to right;
+  - repeat: two adjacent digits are the same;
+  - exact_pair: some group of equal adjacent digits has exactly two;
+  - max_run: no group of equal adjacent digits is longer than max_run.
+count() walks the digits of the upper bound from the left, keeping the
+number of prefixes in each state (previous digit, length of its group so
+far, whether the prefix still equals the bound's, whether a digit has been
+placed yet, and whether the repeat and exact pair rules are already met).
+Prefixes in the same state have the same completions, so each digit costs
+a pass over at most a few thousand states: the count over [lo, hi) takes
+time linear in the number of digits, with Python ints for bounds of any
+size.
+
+brute_force() checks the same rules on every integer of a (small) range
+with NumPy, for cross-validation.
+"""
+import numpy as np
+
+PUZZLE_RANGE = (357253, 892942)
+
+def _group_cap(repeat, exact_pair, max_run):
+    """
+    Longest group length count_upto has to tell apart.
+    """
+    if max_run is not None and max_run < 1:
+        raise ValueError("max_run must be at least 1")
+    cap = 3 if exact_pair else (2 if repeat else 1)
+    if max_run is not None:
+        cap = max(cap,max_run+1)
+    return cap
+
+def count_upto(bound, monotonic=True, repeat=True, exact_pair=False, max_run=None):
+    """
+    Number of passwords in [1, bound].
+    """
+    if bound < 1:
+        return 0
+    cap = _group_cap(repeat,exact_pair,max_run) # longer groups all count as cap
+    digits = [int(d) for d in str(bound)]
+    # (previous digit or -1 before the first, group length, tight, has repeat, has pair) -> count
+    states = {(-1,0,True,False,False):1}
+    for bound_digit in digits:
+        new_states = {}
+        for (prev, run, tight, rep, pair), n in states.items():
+            top = bound_digit if tight else 9
+            low = prev if (monotonic and prev >= 0) else 0
+            for d in range(low,top+1):
+                if prev < 0: # no digit placed yet
+                    if d == 0:
+                        key = (-1,0,False,False,False)
+                    else:
+                        key = (d,1,tight and d == top,False,False)
+                elif d == prev:
+                    r = min(run+1,cap)
+                    if max_run is not None and r > max_run:
+                        continue
+                    key = (d,r,tight and d == top,rep or r >= 2,pair)
+                else:
+                    key = (d,1,tight and d == top,rep,pair or (exact_pair and run == 2))
+                new_states[key] = new_states.get(key,0)+n
+        states = new_states
+    total = 0
+    for (prev, run, tight, rep, pair), n in states.items():
+        if prev < 0:
+            continue # zero
+        if repeat and not rep:
+            continue
+        if exact_pair and not (pair or run == 2):
+            continue
+        total += n
+    return total
+
+def count(lo, hi, monotonic=True, repeat=True, exact_pair=False, max_run=None):
+    """
+    Number of passwords q with lo <= q < hi.
+    """
+    if hi <= lo:
+        return 0
+    rules = (monotonic,repeat,exact_pair,max_run)
+    return count_upto(hi-1,*rules) - count_upto(lo-1,*rules)
+
+def _digit_matrix(values, n_digits):
+    """
+    Digits of values, most significant first, with -1 before the first digit.
+    """
+    d = np.empty((len(values),n_digits),dtype=np.int8)
+    v = values.copy()
+    for j in range(n_digits-1,-1,-1):
+        d[:,j] = v % 10
+        v //= 10
+    started = np.cumsum(d != 0,axis=1) > 0
+    d[~started] = -1
+    return d
+
+def check(values, monotonic=True, repeat=True, exact_pair=False, max_run=None):
+    """
+    Boolean array: which of an array of positive integers are passwords.
+    """
+    values = np.asarray(values,dtype=np.int64)
+    n_digits = len(str(int(values.max()))) if len(values) else 1
+    d = _digit_matrix(values,n_digits)
+    both = (d[:,1:] >= 0) & (d[:,:-1] >= 0)
+    eq = both & (d[:,1:] == d[:,:-1]) # eq[:,j]: digits j and j+1 are equal
+    ok = values > 0
+    if monotonic:
+        ok &= ~(both & (d[:,1:] < d[:,:-1])).any(axis=1)
+    if repeat:
+        ok &= eq.any(axis=1)
+    if exact_pair:
+        pad = np.zeros((len(values),1),dtype=bool)
+        before = np.concatenate((pad,eq[:,:-1]),axis=1)
+        after = np.concatenate((eq[:,1:],pad),axis=1)
+        ok &= (eq & ~before & ~after).any(axis=1)
+    if max_run is not None:
+        # a group longer than max_run is max_run equal pairs in a row
+        long_run = eq.copy()
+        for k in range(1,max_run):
+            long_run = long_run[:,:-1] & eq[:,k:]
+        ok &= ~long_run.any(axis=1)
+    return ok
+
+def brute_force(lo, hi, monotonic=True, repeat=True, exact_pair=False, max_run=None, chunk=1 << 20):
+    """
+    count() by checking every integer in [lo, hi), chunk at a time.
+    """
+    total = 0
+    for start in range(lo,hi,chunk):
+        values = np.arange(start,min(start+chunk,hi),dtype=np.int64)
+        total += int(check(values,monotonic,repeat,exact_pair,max_run).sum())
+    return total
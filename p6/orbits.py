@@ -0,0 +1,154 @@
+"""
+Orbit map index: depths and lowest common ancestors.
+
+Built once from the orbit_tree parent map ({object: what it orbits}):
+  - objects get integer ids and a parent array (roots are their own parent);
+  - depths are filled in one pass: walk up from each object only as far as
+    the first object whose depth is already known, then fill in the path on
+    the way back, so every object is visited a constant number of times;
+  - a binary lifting table up[k][i], the 2**k-th ancestor of i, is built
+    with one NumPy gather per level.
+The total number of orbits is the sum of the depths. The lowest common
+ancestor of two objects, and so the number of orbital transfers between
+them, takes O(log depth) steps; lca_many/transfers_many answer whole
+arrays of queries with the same number of vectorised steps.
+"""
+import numpy as np
+
+def parse_orbits(text):
+    """
+    orbit_tree {object: object it orbits} from lines like "COM)B".
+    """
+    orbit_tree = {}
+    for line in text.strip().split("\n"):
+        X, Y = line.strip().split(")")
+        orbit_tree[Y] = X
+    return orbit_tree
+
+class orbit_index():
+    def __init__(self, orbit_tree):
+        names = list(orbit_tree.keys())
+        ids = {name:i for i,name in enumerate(names)}
+        for X in orbit_tree.values():
+            if X not in ids:
+                ids[X] = len(names)
+                names.append(X)
+        self.names = names
+        self.ids = ids
+        n = len(names)
+        parent = list(range(n)) # roots orbit themselves
+        for Y, X in orbit_tree.items():
+            parent[ids[Y]] = ids[X]
+
+        # depths with memoisation: -1 is unknown
+        depth = [-1]*n
+        for i in range(n):
+            path = []
+            j = i
+            while depth[j] < 0:
+                if parent[j] == j:
+                    depth[j] = 0
+                    break
+                path.append(j)
+                j = parent[j]
+            d = depth[j]
+            for k in reversed(path):
+                d += 1
+                depth[k] = d
+        dtype = np.int32 if n < 2**31 else np.int64
+        self.depth = np.array(depth,dtype=dtype)
+
+        # binary lifting table, enough levels to climb from the deepest object
+        self.up = [np.array(parent,dtype=dtype)]
+        max_depth = int(self.depth.max()) if n else 0
+        while (1 << len(self.up)) <= max_depth:
+            prev = self.up[-1]
+            self.up.append(prev[prev])
+
+    def total_orbits(self):
+        """
+        Direct plus indirect orbits: the sum of all depths.
+        """
+        return int(self.depth.sum(dtype=np.int64))
+
+    def _id(self, obj):
+        return self.ids[obj] if isinstance(obj,str) else obj
+
+    def _lift(self, i, steps):
+        k = 0
+        while steps:
+            if steps & 1:
+                i = self.up[k][i]
+            steps >>= 1
+            k += 1
+        return i
+
+    def lca(self, a, b):
+        """
+        Lowest common ancestor of two objects (names or ids), as a name, or
+        None if they are in different trees.
+        """
+        a, b = self._id(a), self._id(b)
+        da, db = int(self.depth[a]), int(self.depth[b])
+        if da < db:
+            a, b, da, db = b, a, db, da
+        a = int(self._lift(a,da-db))
+        if a != b:
+            for k in range(len(self.up)-1,-1,-1):
+                up = self.up[k]
+                if up[a] != up[b]:
+                    a, b = int(up[a]), int(up[b])
+            a, b = int(self.up[0][a]), int(self.up[0][b])
+            if a != b:
+                return None
+        return self.names[a]
+
+    def distance(self, a, b):
+        """
+        Number of orbit edges between two objects (names or ids).
+        """
+        a, b = self._id(a), self._id(b)
+        c = self.lca(a,b)
+        if c is None:
+            return None
+        return int(self.depth[a])+int(self.depth[b])-2*int(self.depth[self.ids[c]])
+
+    def transfers(self, a, b):
+        """
+        Orbital transfers needed to move from the object a orbits to the
+        object b orbits.
+        """
+        up = self.up[0]
+        return self.distance(int(up[self._id(a)]),int(up[self._id(b)]))
+
+    def lca_many(self, a, b):
+        """
+        Lowest common ancestor ids for arrays of object ids a and b, with
+        -1 where the two are in different trees.
+        """
+        a = np.array(a,dtype=self.depth.dtype)
+        b = np.array(b,dtype=self.depth.dtype)
+        swap = self.depth[a] < self.depth[b]
+        a[swap], b[swap] = b[swap], a[swap].copy()
+        diff = self.depth[a]-self.depth[b]
+        for k, up in enumerate(self.up):
+            lift = (diff >> k) & 1 == 1
+            a[lift] = up[a[lift]]
+        for up in reversed(self.up):
+            move = up[a] != up[b]
+            a[move] = up[a[move]]
+            b[move] = up[b[move]]
+        split = a != b
+        a[split] = self.up[0][a[split]]
+        b[split] = self.up[0][b[split]]
+        return np.where(a == b,a,-1)
+
+    def transfers_many(self, a, b):
+        """
+        transfers() for arrays of object ids; -1 where there is no route.
+        """
+        a = self.up[0][np.asarray(a)]
+        b = self.up[0][np.asarray(b)]
+        c = self.lca_many(a,b)
+        d = self.depth
+        return np.where(c >= 0,d[a].astype(np.int64)+d[b]-2*d[c],-1)
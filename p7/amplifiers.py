@@ -0,0 +1,112 @@
+"""
+Phase-setting search for chains of amplifiers.
+
+Permutations are explored as a tree of phase prefixes. The state of the
+chain after a prefix (every amplifier VM paused after its first pass, plus
+the signal leaving the last one) is computed once and shared by all the
+permutations that extend it, so the cost of a stage is paid once per
+distinct prefix instead of once per permutation. Amplifiers that have just
+read their phase setting are forked from one primed VM per phase value.
+Subtrees below the first phase can be spread over a process pool.
+
+Forks inherit n_steps from the VM they were forked from, so the
+instructions a search executes are counted as the growth of n_steps of
+each VM it runs.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+from intcode import Network, Program
+
+def prime(code, phase):
+    """
+    A VM that has read its phase setting and is waiting for its first signal.
+    """
+    amp = Program(code)
+    amp.add_inputs([phase])
+    amp.run()
+    return amp
+
+def _extend(amps, signal, primed, phase):
+    """
+    Add an amplifier with the given phase to the end of a chain prefix.
+    Return (new chain, signal it emits on its first pass, instructions the
+    new amplifier executed).
+    """
+    amp = primed[phase].fork()
+    amp.add_inputs([signal])
+    start = amp.n_steps
+    _, outputs = amp.run()
+    return amps + (amp,), outputs[-1], amp.n_steps-start
+
+def _feedback(amps, signal):
+    """
+    Run a chain whose first pass is done as a ring until it halts, and
+    return (final signal, instructions executed). The chain is forked
+    first, since prefixes are shared between permutations.
+    """
+    net = Network()
+    nodes = [net.add(amp.fork()) for amp in amps]
+    for src, dst in zip(nodes,nodes[1:]+nodes[:1]):
+        net.connect(src,dst)
+    net.send(nodes[0],[signal])
+    net.run()
+    n_steps = sum(node.vm.n_steps for node in nodes) - sum(amp.n_steps for amp in amps)
+    return nodes[0].inbox.queue[-1], n_steps
+
+def _search(code, phases, n_amps, feedback, prefix):
+    """
+    Best (signal, phase settings) over all permutations starting with
+    prefix, and the number of instructions executed.
+    """
+    primed = {p:prime(code,p) for p in phases}
+    n_steps = sum(amp.n_steps for amp in primed.values())
+    best = (None, None)
+    # stack of (chain so far, signal leaving it, phases used)
+    stack = [((), 0, ())]
+    for p in prefix:
+        amps, signal, used = stack.pop()
+        amps, signal, n = _extend(amps,signal,primed,p)
+        n_steps += n
+        stack.append((amps, signal, used+(p,)))
+    while stack:
+        amps, signal, used = stack.pop()
+        if len(used) == n_amps:
+            if feedback:
+                signal, n = _feedback(amps,signal)
+                n_steps += n
+            if best[0] is None or signal > best[0]:
+                best = (signal, used)
+            continue
+        for p in phases:
+            if p not in used:
+                next_amps, next_signal, n = _extend(amps,signal,primed,p)
+                n_steps += n
+                stack.append((next_amps, next_signal, used+(p,)))
+    return best, n_steps
+
+def phase_search(code, phases, n_amps=None, feedback=False, processes=1, stats=None):
+    """
+    Find the phase settings (distinct values from phases, one per
+    amplifier) giving the largest output signal. With feedback=True the
+    last amplifier feeds the first until the chain halts.
+    With processes > 1, subtrees for each first phase run in a process pool
+    (processes=None uses every CPU).
+    If stats is a dict, the instructions executed are added to
+    stats["instructions"].
+    Return (signal, phase settings).
+    """
+    phases = list(phases)
+    if n_amps is None:
+        n_amps = len(phases)
+    if processes == 1:
+        results = [_search(code,phases,n_amps,feedback,())]
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(_search,code,phases,n_amps,feedback,(p,)) for p in phases]
+            results = [f.result() for f in futures]
+    if stats is not None:
+        stats["instructions"] = stats.get("instructions",0) + sum(n for _, n in results)
+    return max([best for best, _ in results if best[0] is not None], key=lambda r: r[0])
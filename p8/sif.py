@@ -0,0 +1,95 @@
+"""
+Streaming decoder for the Space Image Format.
+
+An image is a run of ASCII digits, layer after layer of h x w pixels. The
+digit file is memory-mapped as uint8, so nothing is read until it is used,
+and decode() walks it once in chunks of whole layers: each chunk is
+turned into digit values (ASCII minus "0", one chunk-sized uint8 copy),
+counted per layer, and used to fill in the pixels of the composite that
+are still transparent. Memory stays at one chunk however many layers the
+image has; once every pixel of the composite is set, later chunks are only
+counted.
+"""
+import numpy as np
+
+BLACK, WHITE, TRANSPARENT = 0, 1, 2
+CHUNK_BYTES = 1 << 22 # digits decoded at a time
+
+def load_digits(fname):
+    """
+    Memory-mapped uint8 ASCII digits of an image file, without the
+    trailing newline.
+    """
+    raw = np.memmap(fname,dtype=np.uint8,mode="r")
+    end = len(raw)
+    while end and raw[end-1] < ord("0"): # newline or other trailing whitespace
+        end -= 1
+    return raw[:end]
+
+def digits_from_text(text):
+    return np.frombuffer(text.strip().encode(),dtype=np.uint8)
+
+def _chunks(digits, h, w, chunk_layers):
+    """
+    (first layer, digit values of shape (layers, h*w)) for each chunk.
+    """
+    size = h*w
+    if len(digits) % size:
+        raise ValueError("{} digits is not a whole number of {}x{} layers".format(len(digits),h,w))
+    n_layers = len(digits)//size
+    if chunk_layers is None:
+        chunk_layers = max(1,CHUNK_BYTES//size)
+    for start in range(0,n_layers,chunk_layers):
+        n = min(chunk_layers,n_layers-start)
+        chunk = digits[start*size:(start+n)*size].reshape(n,size) - np.uint8(ord("0"))
+        yield start, chunk
+
+def _histograms(chunk):
+    counts = np.zeros((len(chunk),10),dtype=np.int64)
+    top = min(int(chunk.max())+1,10) if chunk.size else 0 # images are mostly 0-2
+    for d in range(top):
+        counts[:,d] = np.count_nonzero(chunk == d,axis=1)
+    return counts
+
+def layer_histograms(digits, h, w, chunk_layers=None):
+    """
+    Count of each digit 0-9 in every layer, as (layers, 10) arrays, one
+    chunk of layers at a time.
+    """
+    for _, chunk in _chunks(digits,h,w,chunk_layers):
+        yield _histograms(chunk)
+
+def decode(digits, h, w, chunk_layers=None):
+    """
+    One pass over an image: (composite, layer, counts) where composite is
+    the (h, w) image seen through the layers (each pixel its first
+    non-transparent value, TRANSPARENT if there is none), layer is the
+    index of the layer with the fewest 0 digits (the first one on ties)
+    and counts is that layer's digit histogram.
+    """
+    composite = np.full(h*w,TRANSPARENT,dtype=np.uint8)
+    pending = np.ones(h*w,dtype=bool) # pixels still transparent
+    columns = np.arange(h*w)
+    best_layer, best_counts = None, None
+    for start, chunk in _chunks(digits,h,w,chunk_layers):
+        counts = _histograms(chunk)
+        i = int(counts[:,0].argmin())
+        if best_counts is None or counts[i,0] < best_counts[0]:
+            best_layer, best_counts = start+i, counts[i]
+        if pending.any():
+            cols = columns[pending]
+            opaque = chunk[:,cols] != TRANSPARENT
+            first = opaque.argmax(axis=0)
+            found = opaque[first,np.arange(len(cols))]
+            composite[cols[found]] = chunk[first[found],cols[found]]
+            pending[cols[found]] = False
+    return composite.reshape(h,w), best_layer, best_counts
+
+def checksum(counts):
+    """
+    Number of 1 digits times number of 2 digits in a layer histogram.
+    """
+    return int(counts[1])*int(counts[2])
+
+def render(composite):
+    return "\n".join("".join("#" if p == WHITE else " " for p in row) for row in composite.tolist())
@@ -0,0 +1,14 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0,ROOT)
+
+def day_path(day):
+    """
+    Put a day's folder on sys.path so its modules import as in the notebooks.
+    """
+    path = os.path.join(ROOT,day)
+    if path not in sys.path:
+        sys.path.insert(0,path)
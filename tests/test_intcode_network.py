@@ -0,0 +1,38 @@
+from intcode import Network, Program
+
+ECHO = [3,9,4,9,1105,1,0,99,0,0] # read a value, output it, repeat
+
+def test_restored_node_keeps_receiving():
+    net = Network()
+    node = net.add(Program(ECHO))
+    received = []
+    net.connect(node,received.extend)
+    state = node.vm.snapshot()
+    net.send(node,[1])
+    net.run()
+    node.vm.restore(state) # rebinds vm.inputs
+    net.send(node,[2,3])
+    net.run()
+    assert received == [1,2,3]
+
+COUNT = [104,1,104,2,104,3,104,4,99] # output 1, 2, 3, 4 and halt
+
+def test_sending_to_a_halted_node_is_not_a_deadlock():
+    net = Network()
+    sender = net.add(Program(COUNT))
+    receiver = net.add(Program([3,5,99,0,0,0]),capacity=1) # reads one value, halts
+    net.connect(sender,receiver)
+    assert net.run() == "halted"
+    assert sender.vm.n_steps == 5
+    assert list(receiver.inbox.queue) == [2,3,4] # kept, never read
+
+def test_blocked_sender_wakes_when_its_destination_halts():
+    net = Network()
+    sender = net.add(Program(COUNT)) # scheduled first, finds the inbox full
+    receiver = net.add(Program([99]),capacity=1)
+    net.connect(sender,receiver)
+    net.send(receiver,[0])
+    assert net.run(1) == "busy"
+    assert receiver.senders == [sender]
+    assert net.run() == "halted"
+    assert list(receiver.inbox.queue) == [0,1,2,3,4]
@@ -0,0 +1,63 @@
+from intcode import Program
+
+ECHO = [3,9,4,9,1105,1,0,99,0,0] # read a value, output it, repeat
+
+def test_waiting_for_input_is_not_counted():
+    ran = Program(ECHO)
+    stepped = Program(ECHO)
+    for value in range(5):
+        assert ran.run()[0] == 2
+        exit_code = 0
+        while exit_code == 0:
+            exit_code, _ = stepped._step()
+        assert exit_code == 2
+        ran.add_inputs([value])
+        stepped.add_inputs([value])
+    # four values read, three instructions each
+    assert ran.n_steps == stepped.n_steps == 12
+
+def test_waiting_matches_the_profiler():
+    vm = Program(ECHO)
+    vm.enable_profiling()
+    for value in range(5):
+        vm.run()
+        vm.add_inputs([value])
+    assert sum(vm.profiler.opcodes.values()) == vm.n_steps == 12
+
+def _profiled_steps(vm):
+    return sum(vm.profiler.opcodes.values())
+
+def test_toggling_the_jit_keeps_the_profiler():
+    for toggle in ("enable_jit", "disable_jit"):
+        vm = Program(ECHO)
+        vm.enable_profiling()
+        getattr(vm,toggle)()
+        for value in range(5):
+            vm.run()
+            vm.add_inputs([value])
+        assert vm.profiler is not None
+        assert _profiled_steps(vm) == vm.n_steps == 12
+
+def test_jit_enabled_while_profiling_takes_over_afterwards():
+    vm = Program(ECHO)
+    vm.enable_jit()
+    vm.enable_profiling()
+    vm.disable_jit()
+    vm.enable_jit()
+    vm.add_inputs([1])
+    assert vm.run() == (2, [1])
+    assert _profiled_steps(vm) == 3
+    vm.disable_profiling()
+    vm.add_inputs([2])
+    assert vm.run() == (2, [2])
+    assert vm.jit.n_compiled > 0
+    assert vm.n_steps == 3 # compiled blocks do not count theirs
+
+JUMP_IF_NEGATIVE = [1105,-1,4,99,104,7,99] # jumps to the output only on a nonzero test
+
+def test_jump_if_true_takes_negative_values():
+    vm = Program(JUMP_IF_NEGATIVE)
+    assert vm.run() == (1, [7])
+    jitted = Program(JUMP_IF_NEGATIVE)
+    jitted.enable_jit()
+    assert jitted.run() == (1, [7])
@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+
+from conftest import ROOT, day_path
+
+day_path("p11")
+from intcode import load_program
+from robot import WHITE, paint_hull, registration, robot
+
+CODE = load_program(os.path.join(ROOT,"p11","p11_input.txt"))
+
+def _paint_some(r, n):
+    for _ in range(n): # the loop of robot.paint, stopped early
+        r.prog.add_inputs([int(r.canvas[r.pos[0],r.pos[1],0])])
+        _, outputs = r.prog.run_until()
+        r.canvas[r.pos[0],r.pos[1],0] = outputs[0]
+        r.canvas[r.pos[0],r.pos[1],1] = 1
+        r._advance(outputs[1])
+
+def test_save_and_load_round_trip(tmp_path):
+    fname = str(tmp_path/"robot.sav")
+    r = robot(CODE)
+    r.canvas[0,0,0] = WHITE
+    _paint_some(r,100)
+    r.save(fname)
+
+    restored = robot([99])
+    restored.load(fname)
+    assert restored.pos == r.pos and restored.dir == r.dir
+    assert restored.prog.code.values() == r.prog.code.values()
+    assert restored.canvas.count(1) == r.canvas.count(1)
+
+    restored.paint()
+    done = paint_hull(CODE,start=WHITE)
+    assert restored.canvas.count(1) == done.canvas.count(1)
+    assert np.array_equal(registration(restored),registration(done))
+
+def test_save_before_painting(tmp_path):
+    fname = str(tmp_path/"robot.sav")
+    robot(CODE).save(fname)
+    restored = robot([99])
+    restored.load(fname)
+    assert restored.canvas.tiles == {}
+    restored.paint()
+    assert restored.canvas.count(1) == paint_hull(CODE).canvas.count(1)
@@ -0,0 +1,17 @@
+import pytest
+
+from conftest import day_path
+
+day_path("p17")
+from scaffold import MAX_FUNCTIONS, movement_inputs
+
+def _lines(inputs):
+    return "".join(map(chr,inputs)).split("\n")
+
+def test_unused_functions_are_sent_empty():
+    assert _lines(movement_inputs("A,A",["R,8"])) == ["A,A", "R,8", "", "", "n", ""]
+    assert len(_lines(movement_inputs("A",["R,8"]*MAX_FUNCTIONS,video=True))) == MAX_FUNCTIONS+3
+
+def test_too_many_functions_are_rejected():
+    with pytest.raises(ValueError):
+        movement_inputs("A,B,C,D",["R,8"]*(MAX_FUNCTIONS+1))
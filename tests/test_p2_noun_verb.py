@@ -0,0 +1,35 @@
+import os
+
+from conftest import ROOT, day_path
+
+day_path("p2")
+from noun_verb import find_noun_verb, run_batch, run_pair
+
+METHODS = ("brute", "batch", "symbolic")
+
+def test_negative_address_crashes_in_every_method():
+    code = [1,1,2,0,99] # address 0 gets code[noun] + code[verb]
+    assert run_pair(code,-1,0) is None
+    assert list(run_batch(code,[-1],[0])) == [None]
+    for method in METHODS:
+        assert find_noun_verb(code,100,nouns=range(-3,3),verbs=range(0,3),method=method) is None
+
+def test_methods_agree_when_some_pairs_crash():
+    code = [1,1,2,0,99,7]
+    for target in (1,7,8,14,100):
+        found = {find_noun_verb(code,target,nouns=range(-3,7),verbs=range(-2,7),method=m) for m in METHODS}
+        assert len(found) == 1
+
+def test_batch_finds_matches_past_int64():
+    code = [1,0,0,0] + [2,0,0,0]*6 + [99] # (code[noun]+code[verb])**64
+    target = run_pair(code,2,3)
+    assert target > 2**63
+    assert list(run_batch(code,range(4),range(4))) == [run_pair(code,n,n) for n in range(4)]
+    assert find_noun_verb(code,target,range(4),range(4),method="batch") == (0,2)
+    assert find_noun_verb(code,target,range(4),range(4),method="brute") == (0,2)
+
+def test_puzzle_answer():
+    with open(os.path.join(ROOT,"p2","p2_input.txt"),"r") as f:
+        code = [int(c) for c in f.read().split(",")]
+    for method in METHODS:
+        assert find_noun_verb(code,19690720,method=method) == (64,72)